@@ -3,7 +3,6 @@
 from absl import app, flags, logging
 
 from .core import EmulatorInitializer
-from .utils.helpers import get_default_adb_path
 
 
 FLAGS = flags.FLAGS
@@ -14,8 +13,8 @@ flags.DEFINE_integer(
 )
 flags.DEFINE_string(
     'adb_path',
-    get_default_adb_path(),
-    'Path to the ADB binary.',
+    None,
+    'Path to the ADB binary. Defaults to the platform-specific SDK location.',
 )
 flags.DEFINE_integer(
     'grpc_port', 8554, 'Port for gRPC communication with the emulator.'
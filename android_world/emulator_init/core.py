@@ -1,26 +1,96 @@
 """Core emulator initialization logic."""
 
+import functools
 import json
 import logging
 import os
+import re
 import subprocess
 import time
-from typing import Any, Dict, Optional
+import types
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from android_world.env import env_launcher, adb_utils
 
-from .modules import (
-    DateTimeConfigurator, ContactsConfigurator, SMSConfigurator, SystemConfigurator,
-    CalendarConfigurator, RecipeConfigurator, TasksConfigurator, ExpenseConfigurator,
-    MusicConfigurator, JoplinConfigurator, OsmAndConfigurator, AudioRecorderConfigurator,
-    MarkorConfigurator, FilesConfigurator, OpenTracksConfigurator, GalleryConfigurator
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser.
+    orjson = None
+
+from . import modules
+from .modules.base_configurator import resolve_env
+from .utils.helpers import get_default_adb_path, set_root_if_needed
+
+# Matches an emulator line in `adb devices` output that is online ("device"),
+# not "offline" or "unauthorized".
+_EMULATOR_DEVICE_RE = re.compile(r'^emulator-\d+\s+device\s*$', re.MULTILINE)
+
+
+# Config keys and the names of their configurator classes, in the order
+# they are applied. Classes are resolved lazily via `_configurator_class`.
+_CONFIGURATION_ORDER = (
+    ('datetime', 'DateTimeConfigurator'),
+    ('contacts', 'ContactsConfigurator'),
+    ('sms', 'SMSConfigurator'),
+    ('calendar', 'CalendarConfigurator'),
+    ('recipe', 'RecipeConfigurator'),
+    ('tasks', 'TasksConfigurator'),
+    ('expense', 'ExpenseConfigurator'),
+    ('music', 'MusicConfigurator'),
+    ('joplin', 'JoplinConfigurator'),
+    ('osmand', 'OsmAndConfigurator'),
+    ('audio_recorder', 'AudioRecorderConfigurator'),
+    ('markor', 'MarkorConfigurator'),
+    ('files', 'FilesConfigurator'),
+    ('opentracks', 'OpenTracksConfigurator'),
+    ('gallery', 'GalleryConfigurator'),
+    ('system', 'SystemConfigurator'),
 )
-from .utils.helpers import get_default_adb_path
+
+
+def _paths_overlap(first: str, second: str) -> bool:
+    """Whether two device paths are the same or one lies inside the other."""
+    first, second = first.rstrip('/'), second.rstrip('/')
+    return (first == second or first.startswith(second + '/')
+            or second.startswith(first + '/'))
+
+
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(path: str, mtime_ns: int) -> Mapping[str, Any]:
+    """Parse a configuration file once per (path, modification time).
+
+    Args:
+        path: Absolute path to the configuration JSON file.
+        mtime_ns: Modification time of the file, used to invalidate the cache.
+
+    Returns:
+        Read-only mapping with the parsed configuration.
+    """
+    del mtime_ns  # Only part of the cache key.
+    with open(path, 'rb') as f:
+        data = f.read()
+    parsed = orjson.loads(data) if orjson is not None else json.loads(data)
+    return types.MappingProxyType(parsed)
 
 
 class EmulatorInitializer:
     """Main class for initializing Android emulator based on configuration."""
 
+    # `adb devices` output shared by initializers in this process, keyed by
+    # ADB binary path: (monotonic timestamp, stdout).
+    _adb_devices_cache: Dict[str, Tuple[float, str]] = {}
+    _ADB_DEVICES_TTL_SEC = 5.0
+
+    # Module-level order and lookups derived from it once at class creation.
+    _CONFIGURATION_ORDER = _CONFIGURATION_ORDER
+    _CONFIGURATOR_MAP = dict(_CONFIGURATION_ORDER)
+    _ORDERED_KEYS = tuple(key for key, _ in _CONFIGURATION_ORDER)
+
+    # Upper bound on concurrent parallel-safe configurators; each one mostly
+    # waits on ADB round-trips, and a few in flight already saturate adbd.
+    _MAX_PARALLEL_WORKERS = 4
+
     def __init__(
         self,
         config_path: str,
@@ -50,47 +120,72 @@ class EmulatorInitializer:
         self.device_serial = device_serial
         self.config = self._load_config()
         self.env = None
+        # (env, env_controller) pair resolved once and shared by configurators.
+        self._env_pair = None
         
-        # Verify ADB path exists
-        if not os.path.exists(self.adb_path):
+        # Verify ADB path exists (only needed when we have to discover the emulator)
+        if self._is_emulator_target() and not os.path.exists(self.adb_path):
             logging.warning(f"ADB path does not exist: {self.adb_path}")
             logging.warning("Please provide the correct path using --adb_path")
 
-    def _load_config(self) -> Dict[str, Any]:
+    def _is_emulator_target(self) -> bool:
+        """Whether the target is an emulator (no serial or an 'emulator-' serial)."""
+        return not self.device_serial or self.device_serial.startswith("emulator-")
+
+    def _load_config(self) -> Mapping[str, Any]:
         """Load configuration from JSON file.
 
+        Parsed files are cached per path and modification time, so creating
+        several initializers for the same file only reads it once.
+
         Returns:
-            Dict containing configuration settings.
+            Read-only mapping containing configuration settings.
 
         Raises:
             FileNotFoundError: If the configuration file does not exist.
-            json.JSONDecodeError: If the configuration file is not valid JSON.
+            json.JSONDecodeError: If the configuration file is not valid JSON
+                (orjson.JSONDecodeError, a subclass, when orjson is installed).
         """
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         
-        with open(self.config_path, 'r') as f:
-            return json.load(f)
+        st = os.stat(self.config_path)
+        return _load_config_cached(os.path.abspath(self.config_path), st.st_mtime_ns)
+
+    def _list_adb_devices(self) -> str:
+        """Return `adb devices` output, reusing a recent result if available.
+
+        Raises:
+            subprocess.CalledProcessError: If `adb devices` fails.
+        """
+        cached = self._adb_devices_cache.get(self.adb_path)
+        if cached and time.monotonic() - cached[0] < self._ADB_DEVICES_TTL_SEC:
+            return cached[1]
+        
+        result = subprocess.run([self.adb_path, 'devices'], capture_output=True, text=True, check=True)
+        devices = result.stdout.strip()
+        self._adb_devices_cache[self.adb_path] = (time.monotonic(), devices)
+        return devices
 
     def setup_environment(self) -> None:
         """Set up the Android environment."""
         logging.info('Setting up Android environment...')
         try:
-            # Check if emulator is running via ADB
-            adb_cmd = [self.adb_path, 'devices']
-            try:
-                result = subprocess.run(adb_cmd, capture_output=True, text=True, check=True)
-                devices = result.stdout.strip()
-                logging.info(f"Available devices: {devices}")
-                
-                # If we are targeting a physical device (device_serial is provided and
-                # does not start with "emulator-"), skip the emulator presence check.
-                if (not self.device_serial or self.device_serial.startswith("emulator-")) and "emulator" not in devices:
-                    logging.error("No emulator found! Please start the emulator before running this script or provide a physical device serial via 'device_serial'.")
-                    logging.error("Command: ~/Library/Android/sdk/emulator/emulator -avd EMULATOR_NAME -no-snapshot -grpc 8554")
-                    raise RuntimeError("Emulator not running")
-            except subprocess.CalledProcessError as e:
-                logging.error(f"Failed to run adb devices: {e}")
+            # Check if emulator is running via ADB. When the caller already
+            # targets a known serial, skip the discovery round-trip.
+            if self.device_serial:
+                logging.info(f"Using device serial {self.device_serial}, skipping adb devices check")
+            else:
+                try:
+                    devices = self._list_adb_devices()
+                    logging.info(f"Available devices: {devices}")
+                    
+                    if not _EMULATOR_DEVICE_RE.search(devices):
+                        logging.error("No online emulator found! Please start the emulator before running this script or provide a physical device serial via 'device_serial'.")
+                        logging.error("Command: ~/Library/Android/sdk/emulator/emulator -avd EMULATOR_NAME -no-snapshot -grpc 8554")
+                        raise RuntimeError("Emulator not running")
+                except subprocess.CalledProcessError as e:
+                    logging.error(f"Failed to run adb devices: {e}")
             
             # Try connecting to the environment
             try:
@@ -102,6 +197,7 @@ class EmulatorInitializer:
                     grpc_port=self.grpc_port,
                     device_serial=self.device_serial,
                 )
+                self._env_pair = resolve_env(self.env)
                 logging.info('Android environment set up successfully.')
             except Exception as e:
                 logging.error(f"Failed to connect to the Android environment: {e}")
@@ -119,6 +215,104 @@ class EmulatorInitializer:
             logging.error(f"Error setting up environment: {e}")
             raise
 
+    def _configurator_class(self, config_key: str) -> type:
+        """Return the configurator class for a config key, importing it on demand."""
+        return getattr(modules, self._CONFIGURATOR_MAP[config_key])
+
+    def _configurator_env(self):
+        """Return the environment argument passed to configurators."""
+        return self._env_pair if self._env_pair is not None else self.env
+
+    def _run_configurator(self, config_key: str, configurator_class) -> bool:
+        """Run a single configurator and log its outcome.
+
+        Args:
+            config_key: Key of the configuration section.
+            configurator_class: Configurator class handling that section.
+
+        Returns:
+            True if the configurator succeeded, False otherwise.
+        """
+        try:
+            logging.info(f"Configuring {config_key}...")
+            configurator = configurator_class(
+                self._configurator_env(),  # Pass full env object instead of just controller
+                self.config[config_key]
+            )
+            if configurator.configure():
+                logging.info(f"Successfully configured {config_key}")
+                return True
+            logging.error(f"Failed to configure {config_key}")
+        except Exception as e:
+            logging.error(f"Error configuring {config_key}: {e}")
+        return False
+
+    def _split_middle_phase(self, config_keys: List[str]) -> Tuple[List[Tuple[str, type]], List[Tuple[str, type]]]:
+        """Split the middle configurators into sequential and parallel ones.
+        
+        A parallel-safe configurator only runs concurrently if the device
+        paths it writes do not overlap any other middle configurator's paths;
+        otherwise it keeps its place in the fixed order, which settles the
+        conflict.
+        
+        Args:
+            config_keys: Configured keys between the ordering barriers, in order.
+        
+        Returns:
+            (sequential, parallel) lists of (key, class) pairs.
+        """
+        classes = {key: self._configurator_class(key) for key in config_keys}
+        paths = {key: classes[key].device_paths(self.config[key]) for key in config_keys}
+        
+        def overlaps_others(config_key: str) -> bool:
+            return any(
+                _paths_overlap(path, other_path)
+                for other_key in config_keys if other_key != config_key
+                for path in paths[config_key]
+                for other_path in paths[other_key]
+            )
+        
+        sequential = []
+        parallel = []
+        for config_key in config_keys:
+            if classes[config_key].parallel_safe and not overlaps_others(config_key):
+                parallel.append((config_key, classes[config_key]))
+            else:
+                sequential.append((config_key, classes[config_key]))
+        return sequential, parallel
+
+    def _run_middle_phase(self, sequential: List[Tuple[str, type]],
+                          parallel: List[Tuple[str, type]]) -> Dict[str, bool]:
+        """Run the configurators between the ordering barriers.
+
+        Parallel-safe configurators are submitted to a thread pool while the
+        remaining ones run in order on the calling thread, so their ADB
+        round-trips overlap.
+
+        Args:
+            sequential: (key, class) pairs that must run one at a time.
+            parallel: (key, class) pairs that may run concurrently.
+
+        Returns:
+            Mapping from config key to whether it succeeded.
+        """
+        results = {}
+        if not parallel:
+            for config_key, configurator_class in sequential:
+                results[config_key] = self._run_configurator(config_key, configurator_class)
+            return results
+        
+        with ThreadPoolExecutor(max_workers=min(self._MAX_PARALLEL_WORKERS, len(parallel))) as executor:
+            pending = {
+                executor.submit(self._run_configurator, config_key, configurator_class): config_key
+                for config_key, configurator_class in parallel
+            }
+            for config_key, configurator_class in sequential:
+                results[config_key] = self._run_configurator(config_key, configurator_class)
+            for future in as_completed(pending):
+                results[pending[future]] = future.result()
+        return results
+
     def initialize(self) -> bool:
         """Initialize the emulator with all configured modules.
 
@@ -128,49 +322,43 @@ class EmulatorInitializer:
         logging.info("Beginning emulator initialization with config: %s", self.config_path)
         
         try:
-            self.setup_environment()
+            # Import the configurators this config needs while the environment
+            # connects in the background; env setup takes seconds.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                env_future = executor.submit(self.setup_environment)
+                for config_key in self._ORDERED_KEYS:
+                    if config_key in self.config:
+                        self._configurator_class(config_key)
+                env_future.result()
+            
+            # 'datetime' runs first and 'system' runs last as ordering barriers.
+            # In between, configurators that only touch device files overlap
+            # with the ones that drive apps, which still run one at a time.
+            first_key, *middle_keys, last_key = self._ORDERED_KEYS
+            sequential, parallel = self._split_middle_phase(
+                [key for key in middle_keys if key in self.config]
+            )
+            
+            results = {}
+            if first_key in self.config:
+                results[first_key] = self._run_configurator(first_key, self._configurator_class(first_key))
             
-            configuration_order = [
-                ('datetime', DateTimeConfigurator),
-                ('contacts', ContactsConfigurator),
-                ('sms', SMSConfigurator),
-                ('calendar', CalendarConfigurator),
-                ('recipe', RecipeConfigurator),
-                ('tasks', TasksConfigurator),
-                ('expense', ExpenseConfigurator),
-                ('music', MusicConfigurator),
-                ('joplin', JoplinConfigurator),
-                ('osmand', OsmAndConfigurator),
-                ('audio_recorder', AudioRecorderConfigurator),
-                ('markor', MarkorConfigurator),
-                ('files', FilesConfigurator),
-                ('opentracks', OpenTracksConfigurator),
-                ('gallery', GalleryConfigurator),
-                ('system', SystemConfigurator), 
-            ]
+            if parallel:
+                # Root once up front: `adb root` restarts adbd when it is not
+                # root yet, which would break commands in flight on other
+                # threads. Later calls then find adbd rooted and are no-ops.
+                _, env_controller = self._env_pair or resolve_env(self.env)
+                set_root_if_needed(env_controller)
+            results.update(self._run_middle_phase(sequential, parallel))
             
-            success_count = 0
-            total_count = 0
+            if last_key in self.config:
+                results[last_key] = self._run_configurator(last_key, self._configurator_class(last_key))
             
-            for config_key, configurator_class in configuration_order:
-                if config_key in self.config:
-                    total_count += 1
-                    try:
-                        logging.info(f"Configuring {config_key}...")
-                        configurator = configurator_class(
-                            self.env,  # Pass full env object instead of just controller
-                            self.config[config_key]
-                        )
-                        if configurator.configure():
-                            success_count += 1
-                            logging.info(f"Successfully configured {config_key}")
-                        else:
-                            logging.error(f"Failed to configure {config_key}")
-                    except Exception as e:
-                        logging.error(f"Error configuring {config_key}: {e}")
+            success_count = sum(results.values())
+            total_count = len(results)
             
             # Handle remaining configurations that might not be in the order list
-            remaining_configs = set(self.config.keys()) - {item[0] for item in configuration_order}
+            remaining_configs = self.config.keys() - self._CONFIGURATOR_MAP.keys()
             for config_key in remaining_configs:
                 total_count += 1
                 logging.warning(f"Configuration for '{config_key}' not found in configuration order")
@@ -187,99 +375,18 @@ class EmulatorInitializer:
             logging.error(f"Critical error during initialization: {e}")
             return False
 
-    # Backward compatibility methods
-    def configure_datetime(self) -> None:
-        """Configure datetime settings (backward compatibility)."""
-        if 'datetime' in self.config:
-            configurator = DateTimeConfigurator(self.env, self.config['datetime'])
-            configurator.configure()
-
-    def configure_contacts(self) -> None:
-        """Configure contacts (backward compatibility)."""
-        if 'contacts' in self.config:
-            configurator = ContactsConfigurator(self.env, self.config['contacts'])
-            configurator.configure()
-
-    def configure_sms(self) -> None:
-        """Configure SMS messages (backward compatibility)."""
-        if 'sms' in self.config:
-            configurator = SMSConfigurator(self.env, self.config['sms'])
-            configurator.configure()
-
-    def configure_calendar(self) -> None:
-        """Configure calendar events (backward compatibility)."""
-        if 'calendar' in self.config:
-            configurator = CalendarConfigurator(self.env, self.config['calendar'])
-            configurator.configure()
-
-    def configure_recipe(self) -> None:
-        """Configure recipe app (backward compatibility)."""
-        if 'recipe' in self.config:
-            configurator = RecipeConfigurator(self.env, self.config['recipe'])
-            configurator.configure()
-
-    def configure_tasks(self) -> None:
-        """Configure tasks app (backward compatibility)."""
-        if 'tasks' in self.config:
-            configurator = TasksConfigurator(self.env, self.config['tasks'])
-            configurator.configure()
-
-    def configure_expense(self) -> None:
-        """Configure expense app (backward compatibility)."""
-        if 'expense' in self.config:
-            configurator = ExpenseConfigurator(self.env, self.config['expense'])
-            configurator.configure()
-
-    def configure_music(self) -> None:
-        """Configure music app (backward compatibility)."""
-        if 'music' in self.config:
-            configurator = MusicConfigurator(self.env, self.config['music'])
-            configurator.configure()
-
-    def configure_joplin(self) -> None:
-        """Configure Joplin app (backward compatibility)."""
-        if 'joplin' in self.config:
-            configurator = JoplinConfigurator(self.env, self.config['joplin'])
-            configurator.configure()
-
-    def configure_osmand(self) -> None:
-        """Configure OsmAnd app (backward compatibility)."""
-        if 'osmand' in self.config:
-            configurator = OsmAndConfigurator(self.env, self.config['osmand'])
-            configurator.configure()
-
-    def configure_audio_recorder(self) -> None:
-        """Configure audio recorder app (backward compatibility)."""
-        if 'audio_recorder' in self.config:
-            configurator = AudioRecorderConfigurator(self.env, self.config['audio_recorder'])
-            configurator.configure()
-
-    def configure_markor(self) -> None:
-        """Configure Markor app (backward compatibility)."""
-        if 'markor' in self.config:
-            configurator = MarkorConfigurator(self.env, self.config['markor'])
-            configurator.configure()
-
-    def configure_files(self) -> None:
-        """Configure files app (backward compatibility)."""
-        if 'files' in self.config:
-            configurator = FilesConfigurator(self.env, self.config['files'])
-            configurator.configure()
-
-    def configure_opentracks(self) -> None:
-        """Configure OpenTracks app (backward compatibility)."""
-        if 'opentracks' in self.config:
-            configurator = OpenTracksConfigurator(self.env, self.config['opentracks'])
-            configurator.configure()
-
-    def configure_gallery(self) -> None:
-        """Configure gallery app (backward compatibility)."""
-        if 'gallery' in self.config:
-            configurator = GalleryConfigurator(self.env, self.config['gallery'])
-            configurator.configure()
-
-    def configure_system(self) -> None:
-        """Configure system settings (backward compatibility)."""
-        if 'system' in self.config:
-            configurator = SystemConfigurator(self.env, self.config['system'])
-            configurator.configure() 
\ No newline at end of file
+    # Backward compatibility: configure_<key>() applies a single section.
+    def __getattr__(self, name: str):
+        """Resolve `configure_<key>` methods for known configuration keys."""
+        prefix = 'configure_'
+        if name.startswith(prefix):
+            config_key = name[len(prefix):]
+            if config_key in self._CONFIGURATOR_MAP:
+                def configure() -> None:
+                    if config_key in self.config:
+                        configurator_class = self._configurator_class(config_key)
+                        configurator_class(self._configurator_env(), self.config[config_key]).configure()
+                configure.__name__ = name
+                configure.__doc__ = f"Configure {config_key} settings (backward compatibility)."
+                return configure
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
@@ -0,0 +1,69 @@
+"""Tests for the middle-phase split of the emulator initializer."""
+
+import json
+import os
+import tempfile
+
+from absl.testing import absltest
+
+from emulator_init import core
+
+
+class PathsOverlapTest(absltest.TestCase):
+    
+    def test_same_path(self):
+        self.assertTrue(core._paths_overlap('/sdcard/Music', '/sdcard/Music/'))
+    
+    def test_nested_paths(self):
+        self.assertTrue(core._paths_overlap('/sdcard/Documents', '/sdcard/Documents/Markor'))
+        self.assertTrue(core._paths_overlap('/sdcard/Documents/Markor', '/sdcard/Documents'))
+    
+    def test_sibling_with_common_prefix(self):
+        self.assertFalse(core._paths_overlap('/sdcard/Doc', '/sdcard/Documents'))
+    
+    def test_disjoint_paths(self):
+        self.assertFalse(core._paths_overlap('/sdcard/Music', '/data/data/net.osmand'))
+
+
+class SplitMiddlePhaseTest(absltest.TestCase):
+    
+    def _initializer(self, config):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as config_file:
+            json.dump(config, config_file)
+        self.addCleanup(os.remove, config_file.name)
+        return core.EmulatorInitializer(config_file.name, device_serial='device-under-test')
+    
+    def _split(self, config):
+        sequential, parallel = self._initializer(config)._split_middle_phase(list(config))
+        return [key for key, _ in sequential], [key for key, _ in parallel]
+    
+    def test_disjoint_parallel_safe_configurators_run_in_parallel(self):
+        sequential, parallel = self._split({'markor': {}, 'opentracks': {}, 'joplin': {}})
+        self.assertEqual(sequential, ['joplin'])
+        self.assertEqual(parallel, ['markor', 'opentracks'])
+    
+    def test_overlapping_paths_keep_both_sequential(self):
+        sequential, parallel = self._split({
+            'markor': {},
+            'files': {'create_folders': ['Documents/Markor/Work']},
+            'opentracks': {},
+        })
+        self.assertEqual(sequential, ['markor', 'files'])
+        self.assertEqual(parallel, ['opentracks'])
+    
+    def test_overlap_with_sequential_configurator_counts(self):
+        sequential, parallel = self._split({
+            'music': {},
+            'files': {'add_files': [{'folder': 'Music', 'name': 'a.txt'}]},
+        })
+        self.assertEqual(sequential, ['music', 'files'])
+        self.assertEqual(parallel, [])
+    
+    def test_parallel_unsafe_configurator_stays_sequential(self):
+        sequential, parallel = self._split({'music': {}, 'osmand': {}})
+        self.assertEqual(sequential, ['music', 'osmand'])
+        self.assertEqual(parallel, [])
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
+"""Script wrapper for running emulator initialization from a source checkout.
 
-import sys
-import os
+When the package is installed, prefer the `emulator-init` console script,
+which imports `emulator_init.cli` directly.
+"""
 
-# Add the parent directory to the path so we can import emulator_init as a package
-parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
+import os
+import sys
 
 if __name__ == '__main__':
+    # Add the parent directory to the path so we can import emulator_init as a package
+    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+
     from emulator_init.cli import run_cli
-    run_cli() 
\ No newline at end of file
+    run_cli()
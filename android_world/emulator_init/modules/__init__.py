@@ -1,39 +1,43 @@
-"""Emulator initialization modules."""
-
-from .base_configurator import BaseConfigurator
-from .datetime_configurator import DateTimeConfigurator
-from .contacts_configurator import ContactsConfigurator  
-from .sms_configurator import SMSConfigurator
-from .system_configurator import SystemConfigurator
-from .calendar_configurator import CalendarConfigurator
-from .recipe_configurator import RecipeConfigurator
-from .tasks_configurator import TasksConfigurator
-from .expense_configurator import ExpenseConfigurator
-from .music_configurator import MusicConfigurator
-from .joplin_configurator import JoplinConfigurator
-from .osmand_configurator import OsmAndConfigurator
-from .audio_recorder_configurator import AudioRecorderConfigurator
-from .markor_configurator import MarkorConfigurator
-from .files_configurator import FilesConfigurator
-from .opentracks_configurator import OpenTracksConfigurator
-from .gallery_configurator import GalleryConfigurator
-
-__all__ = [
-    'BaseConfigurator',
-    'DateTimeConfigurator', 
-    'ContactsConfigurator',
-    'SMSConfigurator',
-    'SystemConfigurator',
-    'CalendarConfigurator',
-    'RecipeConfigurator',
-    'TasksConfigurator',
-    'ExpenseConfigurator',
-    'MusicConfigurator',
-    'JoplinConfigurator',
-    'OsmAndConfigurator',
-    'AudioRecorderConfigurator',
-    'MarkorConfigurator',
-    'FilesConfigurator',
-    'OpenTracksConfigurator',
-    'GalleryConfigurator',
-] 
\ No newline at end of file
+"""Emulator initialization modules.
+
+Configurator classes are imported lazily on first access, so a run only
+loads the modules its configuration actually uses.
+"""
+
+import importlib
+
+# Maps each exported class to the submodule defining it.
+_LAZY = {
+    'BaseConfigurator': 'base_configurator',
+    'DateTimeConfigurator': 'datetime_configurator',
+    'ContactsConfigurator': 'contacts_configurator',
+    'SMSConfigurator': 'sms_configurator',
+    'SystemConfigurator': 'system_configurator',
+    'CalendarConfigurator': 'calendar_configurator',
+    'RecipeConfigurator': 'recipe_configurator',
+    'TasksConfigurator': 'tasks_configurator',
+    'ExpenseConfigurator': 'expense_configurator',
+    'MusicConfigurator': 'music_configurator',
+    'JoplinConfigurator': 'joplin_configurator',
+    'OsmAndConfigurator': 'osmand_configurator',
+    'AudioRecorderConfigurator': 'audio_recorder_configurator',
+    'MarkorConfigurator': 'markor_configurator',
+    'FilesConfigurator': 'files_configurator',
+    'OpenTracksConfigurator': 'opentracks_configurator',
+    'GalleryConfigurator': 'gallery_configurator',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f'.{_LAZY[name]}', __package__)
+    cls = getattr(module, name)
+    globals()[name] = cls
+    return cls
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -3,11 +3,26 @@
 from android_world.env import adb_utils
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import get_installed_packages
+
+_AUDIO_DIR = "/storage/emulated/0/Android/data/com.dimowner.audiorecorder/files/Music/records"
+# Create the directory if needed and clear recording files in one round-trip.
+_CLEAR_RECORDINGS_CMDS = (
+    f'mkdir -p {_AUDIO_DIR}',
+    f'rm -f {_AUDIO_DIR}/*.m4a {_AUDIO_DIR}/*.wav {_AUDIO_DIR}/*.3gp',
+    'echo OK',
+)
 
 
 class AudioRecorderConfigurator(BaseConfigurator):
     """Configurator for AudioRecorder app."""
     
+    __slots__ = ()
+    
+    parallel_safe = True
+    
+    _DEVICE_PATHS = ("/storage/emulated/0/Android/data/com.dimowner.audiorecorder",)
+    
     @property
     def module_name(self) -> str:
         return "AudioRecorder"
@@ -39,8 +54,7 @@ class AudioRecorderConfigurator(BaseConfigurator):
         
         try:
             # Check if app is installed
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if package_name not in all_packages:
+            if package_name not in get_installed_packages(self.env_controller):
                 self.log_warning("AudioRecorder app is not installed! Skipping configuration.")
                 return False
             
@@ -53,25 +67,15 @@ class AudioRecorderConfigurator(BaseConfigurator):
     
     def _clear_recordings(self) -> None:
         """Clear existing recordings."""
-        audiorecorder_data = "/storage/emulated/0/Android/data/com.dimowner.audiorecorder/files/Music/records"
-        
         try:
             self.log_info("Clearing AudioRecorder existing recordings...")
             
-            # Check if directory exists
-            check_dir_cmd = ['shell', f'ls -la {audiorecorder_data} 2>/dev/null || echo "not_found"']
-            check_dir_response = adb_utils.issue_generic_request(check_dir_cmd, self.env_controller)
-            check_result = check_dir_response.generic.output.decode('utf-8', errors='ignore').strip()
+            result = self.run_shell_batch(_CLEAR_RECORDINGS_CMDS)
             
-            if "not_found" in check_result:
-                self.log_info(f"AudioRecorder directory does not exist, creating: {audiorecorder_data}")
-                create_dir_cmd = ['shell', f'mkdir -p {audiorecorder_data}']
-                adb_utils.issue_generic_request(create_dir_cmd, self.env_controller)
-            else:
-                # Clear recording files
-                clear_cmd = ['shell', f'rm -f {audiorecorder_data}/*.m4a {audiorecorder_data}/*.wav {audiorecorder_data}/*.3gp']
-                adb_utils.issue_generic_request(clear_cmd, self.env_controller)
+            if result.strip().endswith("OK"):
                 self.log_info("Successfully cleared AudioRecorder recordings")
+            else:
+                self.log_error(f"Failed to clear AudioRecorder recordings: {result.strip()}")
             
         except Exception as e:
             self.log_error(f"Failed to clear AudioRecorder recordings: {e}") 
\ No newline at end of file
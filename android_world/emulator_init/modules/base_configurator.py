@@ -1,42 +1,125 @@
 """Base configurator class for emulator initialization modules."""
 
 import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from android_env.proto import adb_pb2
+from android_world.env import adb_utils, interface
+from android_world.utils import file_utils
 
 from ..utils.helpers import ensure_app_ready
 
 
+# Batched shell scripts longer than this are pushed to the device and run
+# from a file instead of being passed on the adb command line.
+_MAX_INLINE_SCRIPT_LEN = 64 * 1024
+_DEVICE_SCRIPT_DIR = '/data/local/tmp'
+
+# Printed by run_shell_batch, followed by the stage index, when a stage fails.
+_STAGE_FAILED_MARKER = 'BATCH_STAGE_FAILED:'
+_STAGE_FAILED_RE = re.compile(rf'{_STAGE_FAILED_MARKER}(\d+)\n?')
+
+# Printed when a sqlite3 invocation run by _exec_sqlite fails.
+_SQLITE_FAILED_MARKER = 'SQLITE_FAILED'
+
+# Pragmas for bulk writes. Only journal_mode persists in the database file;
+# the others apply to the sqlite3 connection they are issued on.
+WRITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; '
+    'PRAGMA temp_store=MEMORY; PRAGMA cache_size=-20000;'
+)
+
+# Device paths known to exist, per env controller. Shared by all configurators
+# in a run; only positive results are kept, since a missing path may be
+# created at any time.
+_known_paths = weakref.WeakKeyDictionary()
+_known_paths_lock = threading.Lock()
+
+
+def resolve_env(env) -> Tuple[Any, Any]:
+    """Split an environment object into an (env, env_controller) pair.
+    
+    Args:
+        env: Android environment (AsyncEnv or env_controller depending on context)
+        
+    Returns:
+        Tuple of the full env object (None if only a controller was given) and
+        the controller used for ADB calls
+    """
+    if isinstance(env, interface.AsyncEnv) or hasattr(env, 'base_env'):
+        # This is a new AsyncAndroidEnv object
+        return env, env.base_env
+    if hasattr(env, 'controller'):
+        # This is a full AsyncEnv object (old style)
+        return env, env.controller
+    # This is just an env_controller
+    return None, env
+
+
 class BaseConfigurator(ABC):
     """Base class for all emulator configurators.
     
     This class provides common functionality and interface for all
     specific configurators (SMS, Calendar, etc.).
+    
+    Configurators are slotted; subclasses should declare `__slots__ = ()` (or
+    their own slots) so instances stay free of a per-instance `__dict__`.
     """
     
+    __slots__ = ('env', 'env_controller', 'config', '_log_prefix')
+    
+    # Whether this configurator only issues device-side shell/file operations
+    # (no app launches, UI input or shared local temp directories) and can
+    # therefore run concurrently with other configurators.
+    parallel_safe = False
+    
+    # Device paths this configurator writes, for configurators whose paths do
+    # not depend on their config; see device_paths.
+    _DEVICE_PATHS: Tuple[str, ...] = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        # Per-class logger, created once when the subclass is defined.
+        super().__init_subclass__(**kwargs)
+        cls.logger = logging.getLogger(cls.__name__)
+    
     def __init__(self, env, config: Dict[str, Any]):
         """Initialize the configurator.
         
         Args:
-            env: Android environment (AsyncEnv or env_controller depending on context)
+            env: Android environment (AsyncEnv or env_controller depending on
+                context), or an (env, env_controller) pair from resolve_env()
             config: Configuration dictionary for this module
         """
-        # Handle different types of environment objects
-        if hasattr(env, 'base_env'):
-            # This is a new AsyncAndroidEnv object
-            self.env = env
-            self.env_controller = env.base_env
-        elif hasattr(env, 'controller'):
-            # This is a full AsyncEnv object (old style)
-            self.env = env
-            self.env_controller = env.controller
+        if isinstance(env, tuple):
+            # Pair already resolved by the caller, see resolve_env()
+            self.env, self.env_controller = env
         else:
-            # This is just an env_controller
-            self.env = None
-            self.env_controller = env
-            
+            self.env, self.env_controller = resolve_env(env)
+        
         self.config = config
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self._log_prefix = f"[{self.module_name}] "
+    
+    @classmethod
+    def device_paths(cls, config: Dict[str, Any]) -> Tuple[str, ...]:
+        """Device paths (files or directory trees) this configurator writes.
+        
+        The initializer only runs a parallel-safe configurator concurrently
+        with others if none of these overlap another configurator's paths.
+        
+        Args:
+            config: This configurator's section of the configuration
+            
+        Returns:
+            Paths under /storage/emulated/0 or /data/data
+        """
+        return cls._DEVICE_PATHS
     
     def _ensure_environment(self) -> None:
         """Ensure the environment is properly initialized."""
@@ -54,6 +137,203 @@ class BaseConfigurator(ABC):
         """
         return ensure_app_ready(app_key, self.env_controller)
     
+    def run_shell_batch(self, commands: Sequence[str], separator: str = ' && ', check: bool = False) -> str:
+        """Run several shell commands in a single `adb shell` round-trip.
+        
+        Commands are joined with `&&` by default, so execution stops at the
+        first failure; pass `'; '` to run independent commands regardless.
+        Very long scripts are pushed to the device and run with `sh`.
+        
+        The invocation always exits 0: a non-zero `adb shell` exit makes the
+        controller run the command again and restart the adb server, which
+        would replay the stages that succeeded and disturb concurrent
+        configurators. Failed stages are reported through output markers
+        instead, which are logged and removed from the returned output.
+        
+        Args:
+            commands: Shell commands to run in order
+            separator: Shell operator placed between commands
+            check: Raise if adb reports that the invocation failed or a stage failed
+            
+        Returns:
+            Decoded output of the combined invocation
+            
+        Raises:
+            RuntimeError: If check is set and the invocation or a stage failed
+        """
+        stages = [
+            f'{{ {{ {command}; }} || {{ echo {_STAGE_FAILED_MARKER}{index}; false; }}; }}'
+            for index, command in enumerate(commands)
+        ]
+        script = f'{separator.join(stages)}; true'
+        if len(script) > _MAX_INLINE_SCRIPT_LEN:
+            response = self._run_pushed_script(script)
+        else:
+            response = adb_utils.issue_generic_request(['shell', script], self.env_controller)
+        if check and response.status != adb_pb2.AdbResponse.Status.OK:
+            raise RuntimeError(f'adb shell failed: {response.error_message}')
+        output = response.generic.output.decode('utf-8', errors='ignore')
+        
+        failed = [commands[int(index)] for index in _STAGE_FAILED_RE.findall(output)]
+        for command in failed:
+            self.log_warning(f'Shell batch stage failed: {command[:200]}')
+        if check and failed:
+            raise RuntimeError(f'adb shell stage failed: {failed[0][:200]}')
+        return _STAGE_FAILED_RE.sub('', output)
+    
+    def _run_pushed_script(self, script: str) -> adb_pb2.AdbResponse:
+        """Push a shell script to the device, run it once and remove it, returning the adb response."""
+        with tempfile.NamedTemporaryFile('w', suffix='.sh', delete=False) as script_file:
+            script_file.write(script)
+        remote_path = f"{_DEVICE_SCRIPT_DIR}/{os.path.basename(script_file.name)}"
+        try:
+            file_utils.copy_data_to_device(script_file.name, remote_path, self.env_controller)
+            return adb_utils.issue_generic_request(
+                ['shell', f'sh {remote_path}; rm -f {remote_path}'], self.env_controller
+            )
+        finally:
+            os.remove(script_file.name)
+    
+    def _is_known_path(self, path: str) -> bool:
+        """Whether a device path is already known to exist, without asking the device."""
+        with _known_paths_lock:
+            return path in _known_paths.get(self.env_controller, ())
+    
+    def _remember_path(self, path: str) -> None:
+        """Record that a device path exists, e.g. after creating or pushing it."""
+        with _known_paths_lock:
+            _known_paths.setdefault(self.env_controller, set()).add(path)
+    
+    def _path_exists(self, path: str) -> bool:
+        """Check whether a device path exists, asking the device once per path and run.
+        
+        Args:
+            path: File or directory on the device
+            
+        Returns:
+            True if the path exists
+        """
+        if self._is_known_path(path):
+            return True
+        if not file_utils.check_file_exists(path, self.env_controller, bash_file_test='-e'):
+            return False
+        self._remember_path(path)
+        return True
+    
+    def invalidate_paths(self, paths: Optional[Sequence[str]] = None) -> None:
+        """Forget known device paths after they, or their parents, were removed.
+        
+        Args:
+            paths: Paths to forget along with everything below them; all known
+                paths of this device if None
+        """
+        with _known_paths_lock:
+            known = _known_paths.get(self.env_controller)
+            if not known:
+                return
+            if paths is None:
+                known.clear()
+                return
+            prefixes = tuple(path.rstrip('/') + '/' for path in paths)
+            known.difference_update([
+                known_path for known_path in known
+                if known_path in paths or known_path.startswith(prefixes)
+            ])
+    
+    def _wait_until(self, predicate: Callable[[], bool], timeout_s: float = 5.0,
+                    interval_s: float = 0.1, max_interval_s: float = 1.0) -> bool:
+        """Poll a condition with exponential backoff instead of sleeping blindly.
+        
+        Args:
+            predicate: Condition to check; an exception counts as not yet true
+            timeout_s: Maximum time to wait in seconds
+            interval_s: First delay between checks in seconds
+            max_interval_s: Cap on the delay between checks in seconds
+            
+        Returns:
+            True if the condition held before the timeout, False otherwise
+        """
+        deadline = time.monotonic() + timeout_s
+        while True:
+            try:
+                if predicate():
+                    return True
+            except Exception as e:
+                self.log_debug(f"Wait condition check failed: {e}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval_s, remaining))
+            interval_s = min(interval_s * 2, max_interval_s)
+    
+    def _is_in_foreground(self, package: str) -> bool:
+        """Whether the current activity belongs to the package."""
+        activity, _ = adb_utils.get_current_activity(self.env_controller)
+        return package in (activity or '')
+    
+    def _wait_for_foreground(self, package: str, timeout_s: float = 5.0, present: bool = True) -> bool:
+        """Wait until the package's activity is (or, with present=False, is no longer) in front.
+        
+        Args:
+            package: Package name of the app
+            timeout_s: Maximum time to wait in seconds
+            present: Whether to wait for the app to appear or to leave
+            
+        Returns:
+            True if the state was reached before the timeout, False otherwise
+        """
+        return self._wait_until(lambda: self._is_in_foreground(package) == present, timeout_s)
+    
+    def _is_running(self, package: str) -> bool:
+        """Whether the package has a running process."""
+        # pidof exits 1 when there is no process, which the controller treats
+        # as a failure and answers by restarting the adb server
+        response = adb_utils.issue_generic_request(['shell', f'pidof {package} || true'], self.env_controller)
+        return bool(response.generic.output.strip())
+    
+    def _wait_for_app_ready(self, package: str, timeout_s: float = 3.0) -> bool:
+        """Poll until the app's process is running instead of sleeping blindly.
+        
+        Args:
+            package: Package name of the app
+            timeout_s: Maximum time to wait in seconds
+            
+        Returns:
+            True if the process came up before the timeout, False otherwise
+        """
+        # Process start is quick, so keep polling at a short fixed interval
+        if self._wait_until(lambda: self._is_running(package), timeout_s, interval_s=0.1, max_interval_s=0.1):
+            return True
+        self.log_warning(f"{package} not running after {timeout_s}s, continuing")
+        return False
+    
+    def _exec_sqlite(self, db_path: str, sql: str) -> str:
+        """Run statements against a device database in one sqlite3 call.
+        
+        Like adb_utils.execute_sql_command, roots adbd first since app
+        databases live under /data/data. Long scripts go through
+        run_shell_batch's pushed-script fallback.
+        
+        Args:
+            db_path: Path to the database on the device
+            sql: Statements to run; they are placed inside double quotes
+            
+        Returns:
+            Output of sqlite3, e.g. the rows of a SELECT
+            
+        Raises:
+            RuntimeError: If adb or sqlite3 reports an error
+        """
+        adb_utils.set_root_if_needed(self.env_controller)
+        # Report sqlite3 failures in the output; a non-zero exit would make the
+        # controller restart the adb server
+        output = self.run_shell_batch(
+            [f'sqlite3 {db_path} "{sql}" 2>&1 || echo {_SQLITE_FAILED_MARKER}'], check=True
+        )
+        if _SQLITE_FAILED_MARKER in output or 'error' in output.lower():
+            raise RuntimeError(output.strip())
+        return output
+    
     @abstractmethod
     def configure(self) -> bool:
         """Configure the module based on the provided configuration.
@@ -69,18 +349,20 @@ class BaseConfigurator(ABC):
         """Return the name of this configuration module."""
         pass
     
-    def log_info(self, message: str) -> None:
+    # Extra args are %-formatted by logging only if the record is emitted, so
+    # hot loops should pass them instead of pre-formatting with f-strings.
+    def log_info(self, message: str, *args: Any) -> None:
         """Log an info message with module prefix."""
-        self.logger.info(f"[{self.module_name}] {message}")
+        self.logger.info(self._log_prefix + message, *args)
     
-    def log_warning(self, message: str) -> None:
+    def log_warning(self, message: str, *args: Any) -> None:
         """Log a warning message with module prefix."""
-        self.logger.warning(f"[{self.module_name}] {message}")
+        self.logger.warning(self._log_prefix + message, *args)
     
-    def log_error(self, message: str) -> None:
+    def log_error(self, message: str, *args: Any) -> None:
         """Log an error message with module prefix."""
-        self.logger.error(f"[{self.module_name}] {message}")
+        self.logger.error(self._log_prefix + message, *args)
     
-    def log_debug(self, message: str) -> None:
+    def log_debug(self, message: str, *args: Any) -> None:
         """Log a debug message with module prefix."""
-        self.logger.debug(f"[{self.module_name}] {message}") 
\ No newline at end of file
+        self.logger.debug(self._log_prefix + message, *args) 
\ No newline at end of file
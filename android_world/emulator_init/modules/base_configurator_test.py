@@ -0,0 +1,64 @@
+"""Tests for the shared configurator helpers."""
+
+import subprocess
+from unittest import mock
+
+from absl.testing import absltest
+from android_env.proto import adb_pb2
+
+from emulator_init.modules import base_configurator
+
+
+class _FakeConfigurator(base_configurator.BaseConfigurator):
+    
+    __slots__ = ()
+    
+    @property
+    def module_name(self) -> str:
+        return "Fake"
+    
+    def configure(self) -> bool:
+        return True
+
+
+def _run_locally(args, env_controller):
+    """Stand-in for adb_utils.issue_generic_request running `adb shell` with sh."""
+    del env_controller
+    result = subprocess.run(['sh', '-c', args[1]], capture_output=True, check=False)
+    status = adb_pb2.AdbResponse.Status.OK if result.returncode == 0 else adb_pb2.AdbResponse.Status.ADB_ERROR
+    return adb_pb2.AdbResponse(status=status, generic=adb_pb2.AdbResponse.GenericResponse(output=result.stdout))
+
+
+class RunShellBatchTest(absltest.TestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.enter_context(mock.patch.object(
+            base_configurator.adb_utils, 'issue_generic_request', side_effect=_run_locally
+        ))
+        self.configurator = _FakeConfigurator((None, mock.Mock()), {})
+    
+    def test_and_separator_stops_at_first_failure(self):
+        output = self.configurator.run_shell_batch(['echo one', 'false', 'echo two'])
+        self.assertEqual(output, 'one\n')
+    
+    def test_semicolon_separator_runs_every_stage(self):
+        output = self.configurator.run_shell_batch(['false', 'echo two'], separator='; ')
+        self.assertEqual(output, 'two\n')
+    
+    def test_invocation_exits_zero_when_a_stage_fails(self):
+        self.configurator.run_shell_batch(['false'])
+        script = base_configurator.adb_utils.issue_generic_request.call_args[0][0][1]
+        self.assertEqual(subprocess.run(['sh', '-c', script], check=False).returncode, 0)
+    
+    def test_check_raises_on_failed_stage(self):
+        with self.assertRaisesRegex(RuntimeError, 'test -e /nonexistent'):
+            self.configurator.run_shell_batch(['echo one', 'test -e /nonexistent'], check=True)
+    
+    def test_compound_stages_fail_as_a_whole(self):
+        output = self.configurator.run_shell_batch(['true && false', 'echo two'])
+        self.assertEqual(output, '')
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -1,19 +1,51 @@
 """Calendar configuration for Android emulator."""
 
 import datetime
+import functools
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 from android_world.env import adb_utils
 from android_world.task_evals.single.calendar import calendar_utils
-from android_world.task_evals.utils import sqlite_schema_utils, sqlite_utils
+from android_world.task_evals.utils import sqlite_schema_utils
 
-from .base_configurator import BaseConfigurator
+from .base_configurator import WRITE_PRAGMAS, BaseConfigurator
+from ..utils.helpers import build_batch_insert_sql, get_installed_packages
+
+
+_SECS_PER_DAY = 86400
+_SECS_PER_WEEK = 604800
+
+# Config repeat_interval values -> Simple Calendar repeat interval in seconds.
+_REPEAT_INTERVALS = {'weekly': _SECS_PER_WEEK, 'daily': _SECS_PER_DAY}
+
+# Weekly repeat rule indexed by day of week (1 = Monday ... 7 = Sunday).
+_WEEKLY_RULE = (0,) + tuple(
+    calendar_utils.generate_simple_calendar_weekly_repeat_rule(day) for day in range(1, 8)
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> int:
+    """Parse an ISO datetime string (local time) to a Unix timestamp."""
+    return int(datetime.datetime.fromisoformat(value).timestamp())
+
+
+def _to_unix_ts(value: Any) -> int:
+    """Convert an ISO string or an epoch number to a Unix timestamp."""
+    return _parse_iso(value) if isinstance(value, str) else int(value)
+
+
+def _format_ts(ts: int) -> str:
+    """Format a Unix timestamp in local time for logging."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
 
 
 class CalendarConfigurator(BaseConfigurator):
     """Configurator for calendar events and scheduling."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "Calendar"
@@ -58,25 +90,23 @@ class CalendarConfigurator(BaseConfigurator):
             self.log_info(f"Ensure calendar app {calendar_package} is running...")
             
             # Check if calendar app is installed
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if calendar_package not in all_packages:
+            if calendar_package not in get_installed_packages(self.env_controller):
                 self.log_error(f"Calendar app {calendar_package} is not installed! Please install the app first.")
                 return False
             
             # Launch calendar app
             adb_utils.launch_app("simple calendar pro", self.env_controller)
-            time.sleep(2)  # Wait for app to start
+            self._wait_for_app_ready(calendar_package)
             
             # Ensure root permissions
             adb_utils.set_root_if_needed(self.env_controller)
             
-            # Grant calendar permissions
-            adb_utils.grant_permissions(calendar_package, "android.permission.READ_CALENDAR", self.env_controller)
-            adb_utils.grant_permissions(calendar_package, "android.permission.WRITE_CALENDAR", self.env_controller)
-            
-            # Return to home screen
-            adb_utils.press_home_button(self.env_controller)
-            time.sleep(1)
+            # Grant calendar permissions and return to home screen in one shell call
+            self.run_shell_batch([
+                f"pm grant {calendar_package} android.permission.READ_CALENDAR",
+                f"pm grant {calendar_package} android.permission.WRITE_CALENDAR",
+                "input keyevent KEYCODE_HOME",
+            ], separator='; ')
             
             return True
             
@@ -94,98 +124,95 @@ class CalendarConfigurator(BaseConfigurator):
             self.log_info('Successfully cleared all calendar events')
             
             # Verify clearing was successful
-            try:
-                events = sqlite_utils.get_rows_from_remote_device(
-                    calendar_utils.EVENTS_TABLE,
-                    db_path,
-                    sqlite_schema_utils.CalendarEvent,
-                    self.env_controller  # Use env_controller
-                )
-                self.log_info(f"Remaining events after clearing: {len(events)}")
-            except Exception as e:
-                self.log_warning(f"Unable to verify clearing result: {e}")
+            if self.config.get('verify_after_write', False):
+                try:
+                    self.log_info(f"Remaining events after clearing: {self._count_events()}")
+                except Exception as e:
+                    self.log_warning(f"Unable to verify clearing result: {e}")
                 
         except Exception as e:
             self.log_error(f"Failed to clear calendar events: {e}")
             
             try:
-                # Try alternative method: direct SQL command
-                adb_utils.execute_sql_command(calendar_utils.DB_PATH, "DELETE FROM events;", self.env_controller)
+                # Try alternative method: direct SQL command, compacting in the same exec
+                self._exec_sqlite(calendar_utils.DB_PATH, f"{WRITE_PRAGMAS} DELETE FROM events; VACUUM;")
                 self.log_info("Cleared calendar events using direct SQL command")
             except Exception as e2:
                 self.log_error(f"Alternative clearing method also failed: {e2}")
     
-    def _add_specific_events(self, events_to_add: List[Dict[str, Any]]) -> None:
-        """Add specific calendar events from configuration."""
-        calendar_events = []
+    def _validate_events(self, events_to_add: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Resolve event configs into CalendarEvent fields.
+        
+        Args:
+            events_to_add: Event dictionaries from the configuration
+            
+        Returns:
+            Tuple of CalendarEvent keyword arguments for the valid events and
+            error messages for the ones that could not be parsed
+        """
+        valid = []
+        errors = []
+        log_info = self.log_info  # Bound once for the loop
         
         for i, event in enumerate(events_to_add):
             title = event.get('title', '')
-            description = event.get('description', '')
-            location = event.get('location', '')
             
             # Parse start and end times
-            start_time = event.get('start_time', None)
+            start_time = event.get('start_time_epoch', event.get('start_time', None))
             end_time = event.get('end_time', None)
             
-            # Duration in minutes - used if end_time not provided
-            duration_mins = event.get('duration_mins', 30)
-            
-            # Repeat settings
-            repeat_interval = event.get('repeat_interval', 0)
-            day_of_week = event.get('day_of_week', 0)
-            repeat_rule = 0
-            
-            if repeat_interval == 'weekly' and 1 <= day_of_week <= 7:
-                repeat_interval = 60 * 60 * 24 * 7  # Weekly (seconds)
-                repeat_rule = calendar_utils.generate_simple_calendar_weekly_repeat_rule(day_of_week)
-                self.log_info(f"Set weekly repeat, weekday {day_of_week}, rule value: {repeat_rule}")
-            elif repeat_interval == 'daily':
-                repeat_interval = 60 * 60 * 24  # Daily (seconds)
-                self.log_info("Set daily repeat")
-            else:
-                repeat_interval = 0  # No repeat
-            
-            if title and start_time:
-                try:
-                    # Parse start time to Unix timestamp
-                    if isinstance(start_time, str):
-                        start_dt = datetime.datetime.fromisoformat(start_time)
-                        start_ts = int(start_dt.timestamp())
-                        self.log_info(f"Event[{i+1}] '{title}' start time: {start_dt}")
-                    else:
-                        # Assume already Unix timestamp
-                        start_ts = start_time
-                        self.log_info(f"Event[{i+1}] '{title}' start timestamp: {start_ts}")
-                    
-                    # Calculate end time
-                    if end_time:
-                        if isinstance(end_time, str):
-                            end_dt = datetime.datetime.fromisoformat(end_time)
-                            end_ts = int(end_dt.timestamp())
-                            self.log_info(f"Event[{i+1}] '{title}' end time: {end_dt}")
-                        else:
-                            end_ts = end_time
-                            self.log_info(f"Event[{i+1}] '{title}' end timestamp: {end_ts}")
+            if not (title and start_time):
+                continue
+            
+            try:
+                # Repeat settings
+                repeat_interval = _REPEAT_INTERVALS.get(event.get('repeat_interval', 0), 0)
+                day_of_week = event.get('day_of_week', 0)
+                repeat_rule = 0
+                
+                if repeat_interval == _SECS_PER_WEEK:
+                    if 1 <= day_of_week <= 7:
+                        repeat_rule = _WEEKLY_RULE[day_of_week]
+                        log_info("Set weekly repeat, weekday %d, rule value: %d", day_of_week, repeat_rule)
                     else:
-                        end_ts = start_ts + (duration_mins * 60)
-                        self.log_info(f"Event[{i+1}] '{title}' duration: {duration_mins} minutes, end timestamp: {end_ts}")
-                    
-                    # Create calendar event object
-                    calendar_event = sqlite_schema_utils.CalendarEvent(
-                        start_ts=start_ts,
-                        end_ts=end_ts,
-                        title=title,
-                        description=description,
-                        location=location,
-                        repeat_interval=repeat_interval,
-                        repeat_rule=repeat_rule
-                    )
-                    
-                    calendar_events.append(calendar_event)
-                    self.log_info(f"Prepared calendar event[{i+1}]: '{title}' at {datetime.datetime.fromtimestamp(start_ts)}")
-                except Exception as e:
-                    self.log_error(f"Failed to create calendar event '{title}': {e}")
+                        repeat_interval = 0  # No repeat without a valid weekday
+                elif repeat_interval == _SECS_PER_DAY:
+                    log_info("Set daily repeat")
+                
+                start_ts = _to_unix_ts(start_time)
+                # Duration in minutes - used if end_time not provided
+                end_ts = _to_unix_ts(end_time) if end_time else start_ts + event.get('duration_mins', 30) * 60
+                
+                log_info("Prepared calendar event[%d]: '%s' at %s, end timestamp: %s",
+                         i + 1, title, _format_ts(start_ts), end_ts)
+            except Exception as e:
+                # One bad event must not drop the others
+                errors.append(f"Failed to create calendar event '{title}': {e}")
+                continue
+            
+            valid.append(dict(
+                start_ts=start_ts,
+                end_ts=end_ts,
+                title=title,
+                description=event.get('description', ''),
+                location=event.get('location', ''),
+                repeat_interval=repeat_interval,
+                repeat_rule=repeat_rule,
+            ))
+        
+        return valid, errors
+    
+    def _build_calendar_events(self, valid: List[Dict[str, Any]]) -> List[sqlite_schema_utils.CalendarEvent]:
+        """Create CalendarEvent objects from validated fields."""
+        calendar_event = sqlite_schema_utils.CalendarEvent
+        return [calendar_event(**fields) for fields in valid]
+    
+    def _add_specific_events(self, events_to_add: List[Dict[str, Any]]) -> None:
+        """Add specific calendar events from configuration."""
+        valid, errors = self._validate_events(events_to_add)
+        if errors:
+            self.log_error("Skipped %d invalid calendar events:\n  %s", len(errors), "\n  ".join(errors))
+        calendar_events = self._build_calendar_events(valid)
         
         # Add events to calendar database
         if calendar_events:
@@ -195,36 +222,49 @@ class CalendarConfigurator(BaseConfigurator):
                 self.log_info(f"Successfully added {len(calendar_events)} events to calendar database")
                 
                 # Verify addition was successful
-                try:
-                    db_path = calendar_utils.DB_PATH
-                    events = sqlite_utils.get_rows_from_remote_device(
-                        calendar_utils.EVENTS_TABLE,
-                        db_path,
-                        sqlite_schema_utils.CalendarEvent,
-                        self.env_controller  # Use env_controller
-                    )
-                    self.log_info(f"Total events after addition: {len(events)}")
-                    for i, event in enumerate(events[:min(5, len(events))]):
-                        self.log_info(f"  - Event[{i+1}]: {event.title} ({datetime.datetime.fromtimestamp(event.start_ts)})")
-                    if len(events) > 5:
-                        self.log_info(f"  - {len(events) - 5} more events...")
-                except Exception as e:
-                    self.log_warning(f"Unable to verify addition result: {e}")
+                if self.config.get('verify_after_write', False):
+                    try:
+                        total = self._count_events()
+                        self.log_info(f"Total events after addition: {total}")
+                        for i, (title, start_ts) in enumerate(self._sample_events(5)):
+                            self.log_info("  - Event[%d]: %s (%s)", i + 1, title, _format_ts(start_ts))
+                        if total > 5:
+                            self.log_info(f"  - {total - 5} more events...")
+                    except Exception as e:
+                        self.log_warning(f"Unable to verify addition result: {e}")
                     
             except Exception as e:
                 self.log_error(f"Failed to add events to calendar database: {e}")
                 
                 try:
-                    # Try adding events one by one
-                    self.log_info("Attempting to add events one by one...")
-                    for i, event in enumerate(calendar_events):
-                        try:
-                            calendar_utils.add_events([event], self.env_controller)  # Use env_controller
-                            self.log_info(f"Successfully added event[{i+1}]: {event.title}")
-                        except Exception as e_inner:
-                            self.log_error(f"Failed to add single event[{i+1}] '{event.title}': {e_inner}")
+                    # Fall back to one direct SQL transaction on the device
+                    self.log_info("Attempting to add events in a single SQL transaction...")
+                    sql = build_batch_insert_sql(calendar_events, calendar_utils.EVENTS_TABLE, calendar_utils.DB_KEY)
+                    self._exec_sqlite(calendar_utils.DB_PATH, f"{WRITE_PRAGMAS} {sql}")
+                    self.log_info(f"Added {len(calendar_events)} events using direct SQL transaction")
                 except Exception as e2:
-                    self.log_error(f"Adding events one by one also failed: {e2}")
+                    self.log_error(f"Direct SQL transaction also failed: {e2}")
+    
+    def _query_events(self, sql: str) -> List[str]:
+        """Run a read-only query on the events database and return output lines."""
+        response = adb_utils.execute_sql_command(calendar_utils.DB_PATH, sql, self.env_controller)
+        output = response.generic.output.decode('utf-8', errors='ignore')
+        return [line for line in output.splitlines() if line.strip()]
+    
+    def _count_events(self) -> int:
+        """Count the rows in the events table without pulling the database."""
+        return int(self._query_events(f"SELECT COUNT(*) FROM {calendar_utils.EVENTS_TABLE};")[0])
+    
+    def _sample_events(self, limit: int) -> List[Tuple[str, int]]:
+        """Return (title, start_ts) for the first few events."""
+        lines = self._query_events(
+            f"SELECT title, start_ts FROM {calendar_utils.EVENTS_TABLE} LIMIT {limit};"
+        )
+        samples = []
+        for line in lines:
+            title, _, start_ts = line.rpartition('|')
+            samples.append((title, int(start_ts)))
+        return samples
     
     def _add_random_events(self) -> None:
         """Add random calendar events if specified."""
@@ -0,0 +1,61 @@
+"""Tests for calendar event validation."""
+
+from unittest import mock
+
+from absl.testing import absltest
+
+from emulator_init.modules import calendar_configurator
+
+
+class ValidateEventsTest(absltest.TestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.configurator = calendar_configurator.CalendarConfigurator((None, mock.Mock()), {})
+    
+    def test_epoch_start_with_default_duration(self):
+        valid, errors = self.configurator._validate_events(
+            [{'title': 'Standup', 'start_time': 1700000000}]
+        )
+        self.assertEmpty(errors)
+        self.assertLen(valid, 1)
+        self.assertEqual(valid[0]['start_ts'], 1700000000)
+        self.assertEqual(valid[0]['end_ts'], 1700000000 + 30 * 60)
+        self.assertEqual(valid[0]['repeat_interval'], 0)
+    
+    def test_weekly_repeat_sets_rule(self):
+        valid, _ = self.configurator._validate_events([{
+            'title': 'Gym', 'start_time': 1700000000, 'repeat_interval': 'weekly', 'day_of_week': 3,
+        }])
+        self.assertEqual(valid[0]['repeat_interval'], calendar_configurator._SECS_PER_WEEK)
+        self.assertEqual(valid[0]['repeat_rule'], calendar_configurator._WEEKLY_RULE[3])
+    
+    def test_weekly_repeat_without_valid_weekday_does_not_repeat(self):
+        valid, _ = self.configurator._validate_events([{
+            'title': 'Gym', 'start_time': 1700000000, 'repeat_interval': 'weekly', 'day_of_week': 9,
+        }])
+        self.assertEqual(valid[0]['repeat_interval'], 0)
+        self.assertEqual(valid[0]['repeat_rule'], 0)
+    
+    def test_events_without_title_or_start_are_skipped(self):
+        valid, errors = self.configurator._validate_events(
+            [{'title': 'No start'}, {'start_time': 1700000000}]
+        )
+        self.assertEmpty(valid)
+        self.assertEmpty(errors)
+    
+    def test_bad_events_are_reported_and_others_kept(self):
+        valid, errors = self.configurator._validate_events([
+            {'title': 'Bad weekday', 'start_time': 1700000000, 'repeat_interval': 'weekly', 'day_of_week': '3'},
+            {'title': 'Bad start', 'start_time': 'tomorrow'},
+            {'title': 'Bad duration', 'start_time': 1700000000, 'duration_mins': 'long'},
+            {'title': 'Good', 'start_time': '2024-01-02T10:00:00', 'end_time': '2024-01-02T11:00:00'},
+        ])
+        self.assertEqual([event['title'] for event in valid], ['Good'])
+        self.assertEqual(valid[0]['end_ts'] - valid[0]['start_ts'], 3600)
+        self.assertLen(errors, 3)
+        self.assertIn("'Bad weekday'", errors[0])
+
+
+if __name__ == '__main__':
+    absltest.main()
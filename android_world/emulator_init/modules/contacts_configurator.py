@@ -1,14 +1,37 @@
 """Contacts configuration for Android emulator."""
 
+import shlex
+from typing import Any, Dict, List, Set
+
 from android_world.utils import contacts_utils
 
 from .base_configurator import BaseConfigurator
 from ..utils.constants import DEFAULT_VALUES
 
 
+# Contacts provider endpoints used to insert contacts without the UI.
+_RAW_CONTACTS_URI = 'content://com.android.contacts/raw_contacts'
+_DATA_URI = 'content://com.android.contacts/data'
+_NAME_MIMETYPE = 'vnd.android.cursor.item/name'
+_PHONE_MIMETYPE = 'vnd.android.cursor.item/phone_v2'
+_PHONE_TYPE_MOBILE = 2
+
+# Prints the id of the newest raw contact from `content query` output
+# ("Row: 0 _id=42"), or nothing if there is none.
+_LAST_RAW_CONTACT_ID_CMD = (
+    f"content query --uri {_RAW_CONTACTS_URI} --projection _id --sort '_id DESC'"
+    " | head -n 1 | sed -n 's/.*_id=//p'"
+)
+
+# Printed, followed by the contact's index, once all rows of a contact are in.
+_ADDED_MARKER = 'CONTACT_ADDED:'
+
+
 class ContactsConfigurator(BaseConfigurator):
     """Configurator for contacts management."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "Contacts"
@@ -40,21 +63,82 @@ class ContactsConfigurator(BaseConfigurator):
     
     def _add_contacts(self) -> None:
         """Add contacts from configuration."""
-        contacts_to_add = self.config.get('add_contacts', [])
-        ui_delay = self.config.get('ui_delay_sec', 1.0)
+        contacts_to_add = [
+            contact for contact in self.config.get('add_contacts', [])
+            if contact.get('name', '') and contact.get('number', '')
+        ]
+        if not contacts_to_add:
+            return
         
-        for contact in contacts_to_add:
-            name = contact.get('name', '')
-            number = contact.get('number', '')
-            
-            if name and number:
-                try:
-                    contacts_utils.add_contact(
-                        name, number, self.env_controller, ui_delay_sec=ui_delay
+        if self.config.get('add_via_ui', False):
+            self._add_contacts_via_ui(contacts_to_add)
+            return
+        
+        try:
+            added = self._bulk_add_contacts_provider(contacts_to_add)
+            for index, contact in enumerate(contacts_to_add):
+                if index in added:
+                    self.log_info(f"Added contact: {contact['name']} ({contact['number']})")
+                else:
+                    self.log_error(
+                        f"Failed to add contact {contact['name']} through the provider; "
+                        "set add_via_ui to use the UI instead"
                     )
-                    self.log_info(f'Added contact: {name} ({number})')
-                except Exception as e:
-                    self.log_error(f"Failed to add contact {name}: {e}")
+        except Exception as e:
+            self.log_error(f"Failed to add contacts through the provider: {e}")
+    
+    def _bulk_add_contacts_provider(self, contacts: List[Dict[str, Any]]) -> Set[int]:
+        """Insert contacts through the contacts provider in one adb shell call.
+        
+        Each contact is a raw contact plus name and phone data rows; the raw
+        contact id is read back on the device so no round-trip is needed.
+        `content insert` can fail without a non-zero exit, so the data rows are
+        only inserted once a new raw contact id shows up, and each contact is
+        independent of the others.
+        
+        Args:
+            contacts: Contacts with 'name' and 'number' keys
+            
+        Returns:
+            Indexes of the contacts whose rows were all inserted
+        """
+        commands = [f"id=$({_LAST_RAW_CONTACT_ID_CMD})"]
+        for index, contact in enumerate(contacts):
+            commands.append(' && '.join([
+                f"content insert --uri {_RAW_CONTACTS_URI} --bind starred:i:0",
+                f"new_id=$({_LAST_RAW_CONTACT_ID_CMD})",
+                '[ -n "$new_id" ]',
+                '[ "$new_id" != "$id" ]',
+                'id=$new_id',
+                f"content insert --uri {_DATA_URI} --bind raw_contact_id:i:$id"
+                f" --bind mimetype:s:{_NAME_MIMETYPE}"
+                f" --bind {shlex.quote('data1:s:' + str(contact['name']))}",
+                f"content insert --uri {_DATA_URI} --bind raw_contact_id:i:$id"
+                f" --bind mimetype:s:{_PHONE_MIMETYPE}"
+                f" --bind {shlex.quote('data1:s:' + str(contact['number']))}"
+                f" --bind data2:i:{_PHONE_TYPE_MOBILE}",
+                f"echo {_ADDED_MARKER}{index}",
+            ]))
+        output = self.run_shell_batch(commands, separator='; ')
+        return {
+            int(line[len(_ADDED_MARKER):]) for line in output.splitlines()
+            if line.startswith(_ADDED_MARKER)
+        }
+    
+    def _add_contacts_via_ui(self, contacts: List[Dict[str, Any]]) -> None:
+        """Add contacts one by one through the contact editor UI."""
+        ui_delay = self.config.get('ui_delay_sec', 1.0)
+        
+        for contact in contacts:
+            name = contact['name']
+            number = contact['number']
+            try:
+                contacts_utils.add_contact(
+                    name, number, self.env_controller, ui_delay_sec=ui_delay
+                )
+                self.log_info(f'Added contact: {name} ({number})')
+            except Exception as e:
+                self.log_error(f"Failed to add contact {name}: {e}")
     
     def _verify_contacts(self) -> None:
         """Verify that contacts were added correctly."""
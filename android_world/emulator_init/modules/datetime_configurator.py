@@ -2,16 +2,22 @@
 
 import datetime
 import random
-from typing import Dict, Any
+import shlex
+from typing import List, Optional, Tuple
 
 from android_world.utils import datetime_utils
 
 from .base_configurator import BaseConfigurator
 
 
+_FAILED_MARKER = 'FAILED: '
+
+
 class DateTimeConfigurator(BaseConfigurator):
     """Configurator for datetime settings."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "DateTime"
@@ -23,86 +29,92 @@ class DateTimeConfigurator(BaseConfigurator):
         self.log_info('Configuring datetime settings...')
         
         try:
+            # Collect all device changes as (description, command) pairs and
+            # apply them in one adb shell call
+            items: List[Tuple[str, str]] = []
+            
             # Disable auto settings if specified (default: True like original)
             if self.config.get('disable_auto_settings', True):
-                self._disable_auto_settings()
+                items.append((
+                    'disable automatic date, time, and timezone settings',
+                    ' && '.join(self._disable_auto_settings()),
+                ))
             
             # Set 24-hour format if specified (default: True like original)
             if self.config.get('use_24_hour_format', True):
-                self._enable_24_hour_format()
-                self.log_info('Set 24-hour time format.')
+                items.append(('set 24-hour time format', self._enable_24_hour_format()))
             
             # Set timezone if specified
             timezone = self.config.get('timezone')
             if timezone:
-                self._set_timezone(timezone)
-                self.log_info(f'Set timezone to {timezone}.')
+                items.append((f'set timezone to {timezone}', self._set_timezone(timezone)))
             
             # Set specific datetime if provided
+            dt = None
             if 'datetime' in self.config:
-                self._set_specific_datetime()
+                dt = self._get_specific_datetime()
             
             # Set random datetime if configured
             elif self.config.get('use_random_datetime', False):
-                self._set_random_datetime()
+                dt = self._get_random_datetime()
             
-            return True
+            if dt is not None:
+                items.append((f'set datetime to {dt}', self._set_datetime_direct(dt)))
+            
+            return self._run_settings(items)
             
         except Exception as e:
             self.log_error(f"Failed to configure datetime: {e}")
             return False
     
-    def _disable_auto_settings(self) -> None:
-        """Disable automatic date/time/timezone settings."""
-        try:
-            # Use the existing _disable_auto_settings function from datetime_utils
-            from android_env.proto import adb_pb2
-            from android_world.env import adb_utils
+    def _run_settings(self, items: List[Tuple[str, str]]) -> bool:
+        """Run the settings commands in one adb shell call and log each outcome.
+        
+        Args:
+            items: (description, shell command) pairs
             
-            adb_utils.put_settings(
-                adb_pb2.AdbRequest.SettingsRequest.Namespace.GLOBAL, 'auto_time', '0', self.env_controller
-            )
-            adb_utils.put_settings(
-                adb_pb2.AdbRequest.SettingsRequest.Namespace.GLOBAL,
-                'auto_time_zone',
-                '0',
-                self.env_controller,
-            )
-            self.log_info('Disabled automatic date, time, and timezone settings.')
-        except Exception as e:
-            self.log_error(f"Failed to disable auto settings: {e}")
+        Returns:
+            bool: True if every command succeeded
+        """
+        if not items:
+            return True
+        commands = [
+            f"{{ {command}; }} || echo {shlex.quote(_FAILED_MARKER + label)}"
+            for label, command in items
+        ]
+        output = self.run_shell_batch(commands, separator='; ')
+        failed = {
+            line[len(_FAILED_MARKER):] for line in output.splitlines()
+            if line.startswith(_FAILED_MARKER)
+        }
+        for label, _ in items:
+            if label in failed:
+                self.log_error(f'Failed to {label}')
+            else:
+                self.log_info(f'Done: {label}')
+        return not failed
     
-    def _enable_24_hour_format(self) -> None:
-        """Set device to use 24-hour time format."""
-        try:
-            from android_env.proto import adb_pb2
-            from android_world.env import adb_utils
-            
-            adb_utils.put_settings(
-                adb_pb2.AdbRequest.SettingsRequest.Namespace.SYSTEM,
-                'time_12_24',
-                '24',
-                self.env_controller,
-            )
-        except Exception as e:
-            self.log_error(f"Failed to enable 24-hour format: {e}")
+    def _disable_auto_settings(self) -> List[str]:
+        """Commands disabling automatic date/time/timezone settings."""
+        return [
+            'settings put global auto_time 0',
+            'settings put global auto_time_zone 0',
+        ]
+    
+    def _enable_24_hour_format(self) -> str:
+        """Command setting the device to use 24-hour time format."""
+        return 'settings put system time_12_24 24'
     
-    def _set_timezone(self, timezone: str) -> None:
-        """Set the device timezone.
+    def _set_timezone(self, timezone: str) -> str:
+        """Command setting the device timezone.
 
         Args:
             timezone: Timezone string (e.g., 'UTC', 'America/New_York').
         """
-        try:
-            from android_world.env import adb_utils
-            
-            adb_command = ['shell', 'service', 'call', 'alarm', '3', 's16', timezone]
-            adb_utils.issue_generic_request(adb_command, self.env_controller)
-        except Exception as e:
-            self.log_error(f"Failed to set timezone: {e}")
+        return f'service call alarm 3 s16 {shlex.quote(timezone)}'
     
-    def _set_specific_datetime(self) -> None:
-        """Set specific datetime from configuration."""
+    def _get_specific_datetime(self) -> Optional[datetime.datetime]:
+        """Get the specific datetime from configuration."""
         datetime_config = self.config['datetime']
         
         try:
@@ -116,19 +128,16 @@ class DateTimeConfigurator(BaseConfigurator):
                 second = datetime_config.get('second', 0)
                 
                 if all(param is not None for param in [year, month, day]):
-                    dt = datetime.datetime(year, month, day, hour, minute, second)
-                    self._set_datetime_direct(dt)
-                    self.log_info(f'Set datetime to {dt}.')
+                    return datetime.datetime(year, month, day, hour, minute, second)
             elif isinstance(datetime_config, str):
                 # Parse datetime from string format
-                dt = datetime.datetime.fromisoformat(datetime_config)
-                self._set_datetime_direct(dt)
-                self.log_info(f'Set datetime to {dt}.')
+                return datetime.datetime.fromisoformat(datetime_config)
         except Exception as e:
-            self.log_error(f"Failed to set specific datetime: {e}")
+            self.log_error(f"Failed to parse specific datetime: {e}")
+        return None
     
-    def _set_random_datetime(self) -> None:
-        """Set random datetime within specified window."""
+    def _get_random_datetime(self) -> Optional[datetime.datetime]:
+        """Get a random datetime within the specified window."""
         try:
             window_size_days = self.config.get('random_window_size_days', 14)
             window_size = datetime.timedelta(days=window_size_days)
@@ -140,24 +149,15 @@ class DateTimeConfigurator(BaseConfigurator):
                 # Use current time as center if not specified
                 window_center = datetime.datetime.now()
             
-            random_dt = datetime_utils.generate_random_datetime(
+            return datetime_utils.generate_random_datetime(
                 window_size=window_size,
                 window_center=window_center
             )
-            self._set_datetime_direct(random_dt)
-            self.log_info(f'Set random datetime to {random_dt}.')
         except Exception as e:
-            self.log_error(f"Failed to set random datetime: {e}")
+            self.log_error(f"Failed to generate random datetime: {e}")
+            return None
     
-    def _set_datetime_direct(self, dt: datetime.datetime) -> None:
-        """Set datetime directly using ADB commands."""
-        try:
-            from android_world.env import adb_utils
-            
-            # Format datetime for Android's date command: MMDDhhmm[[CC]YY][.ss]
-            formatted_time = dt.strftime('%m%d%H%M%y.%S')
-            adb_utils.issue_generic_request(
-                ['shell', 'date', formatted_time], self.env_controller
-            )
-        except Exception as e:
-            self.log_error(f"Failed to set datetime directly: {e}") 
\ No newline at end of file
+    def _set_datetime_direct(self, dt: datetime.datetime) -> str:
+        """Command setting the device clock to dt."""
+        # Format datetime for Android's date command: MMDDhhmm[[CC]YY][.ss]
+        return f"date {dt.strftime('%m%d%H%M%y.%S')}"
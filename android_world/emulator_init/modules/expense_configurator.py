@@ -1,20 +1,42 @@
 """Expense configuration for Android emulator."""
 
 import os
-import random
 import time
 from typing import Dict, Any, List
 
+import numpy as np
 from android_world.env import adb_utils
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.task_evals.utils import sqlite_utils
+from android_world.utils import file_utils
 
-from .base_configurator import BaseConfigurator
+from .base_configurator import WRITE_PRAGMAS, BaseConfigurator
+from ..utils.helpers import build_batch_insert_sql, get_installed_packages
+
+
+# Above this many rows, rebuilding the database locally and pushing it back
+# is faster than device-side INSERT statements over `adb shell`.
+_BULK_REPLACE_DB_THRESHOLD = 200
+
+_APP_NAME = 'Pro Expense'
+_PACKAGE_NAME = 'com.arduia.expense'
+_DB_PATH = '/data/data/com.arduia.expense/databases/accounting.db'
+_TABLE_NAME = 'expense'
+
+
+def _parse_amount(value: Any) -> float:
+    """Parse a dollar amount, returning NaN when it is not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
 
 
 class ExpenseConfigurator(BaseConfigurator):
     """Configurator for Pro Expense app."""
 
+    __slots__ = ()
+
     @property
     def module_name(self) -> str:
         return "Expense"
@@ -26,13 +48,13 @@ class ExpenseConfigurator(BaseConfigurator):
         self.log_info('Configuring Pro Expense app...')
 
         # Database and table information
-        db_path = '/data/data/com.arduia.expense/databases/accounting.db'
-        table_name = 'expense'
-        app_name = 'Pro Expense'
+        db_path = _DB_PATH
+        table_name = _TABLE_NAME
+        app_name = _APP_NAME
 
         try:
             # Check if app is installed
-            if not self._is_app_installed('com.arduia.expense'):
+            if not self._is_app_installed(_PACKAGE_NAME):
                 self.log_warning(f"{app_name} is not installed, skipping configuration")
                 return False
 
@@ -64,16 +86,48 @@ class ExpenseConfigurator(BaseConfigurator):
 
     def _is_app_installed(self, package_name: str) -> bool:
         """Check if the app is installed on the device."""
-        all_packages = adb_utils.get_all_package_names(self.env_controller)
-        return package_name in all_packages
+        return package_name in get_installed_packages(self.env_controller)
+
+    def _database_exists(self) -> bool:
+        """Check whether the app has already created its database."""
+        adb_utils.set_root_if_needed(self.env_controller)  # /data/data needs root
+        # Always exits 0; a failing adb shell command restarts the adb server
+        return file_utils.check_file_exists(_DB_PATH, self.env_controller)
+
+    def _has_expense_table(self) -> bool:
+        """Check whether the app has created the expense table yet.
+
+        Room creates the database file before its schema, so the file alone
+        does not mean rows can be inserted. The file is checked first since
+        sqlite3 would otherwise create it, owned by root.
+        """
+        if not self._database_exists():
+            return False
+        try:
+            output = self._exec_sqlite(
+                _DB_PATH,
+                f"SELECT count(*) FROM sqlite_master WHERE type='table' AND name='{_TABLE_NAME}';",
+            )
+        except RuntimeError:
+            # Locked or half-written while the app sets it up
+            return False
+        return output.strip() == '1'
 
     def _initialize_database(self, app_name: str) -> None:
-        """Launch the app to ensure database is created."""
-        self.log_info(f"Initializing {app_name} database...")
-        adb_utils.launch_app(app_name, self.env_controller)
-        time.sleep(2)  # Wait for app to initialize
-        adb_utils.close_app(app_name, self.env_controller)
-        time.sleep(1)
+        """Ensure the database exists and the app is stopped before writing.
+
+        The app is only launched when its database has not been created yet,
+        i.e. on the first run in this emulator.
+        """
+        if self._database_exists():
+            self.log_info(f"{app_name} database already exists, skipping launch")
+        else:
+            self.log_info(f"Initializing {app_name} database...")
+            adb_utils.launch_app(app_name, self.env_controller)
+            # The app creates its database on start, some time after its process is up
+            if not self._wait_until(self._has_expense_table, timeout_s=10.0):
+                self.log_warning(f"{app_name} database not created after 10s, continuing")
+        adb_utils.close_app(app_name, self.env_controller)  # force-stop is synchronous
 
     def _clear_expenses(self, db_path: str, table_name: str, app_name: str) -> None:
         """Clear all existing expenses."""
@@ -82,58 +136,81 @@ class ExpenseConfigurator(BaseConfigurator):
 
     def _add_expenses(self, expenses: List[Dict[str, Any]], db_path: str, table_name: str, app_name: str) -> None:
         """Add specific expense records."""
+        # Convert amounts from "35.79" to 3579 in one pass; unparseable ones become NaN
+        amounts = np.fromiter(
+            (_parse_amount(expense_data.get('amount', "0.0")) for expense_data in expenses),
+            dtype=float,
+            count=len(expenses),
+        )
+        valid = np.isfinite(amounts)
+        cents = np.rint(np.where(valid, amounts, 0.0) * 100).astype(np.int64)
+        now_ms = int(time.time() * 1000)
+
+        # Bound once for the loop
+        expense = sqlite_schema_utils.Expense
+        log_error = self.log_error
+
         expense_objects = []
-        for expense_data in expenses:
-            try:
-                # Convert amount from "35.79" to 3579
-                amount_str = expense_data.get('amount', "0.0")
-                amount = int(float(amount_str) * 100)
-
-                # Create Expense object
-                expense_obj = sqlite_schema_utils.Expense(
-                    name=expense_data.get('name', expense_data.get('description', '')),
-                    amount=amount,
-                    category=expense_data.get('category', expense_data.get('category_id', 1)),
-                    note=expense_data.get('note', ''),
-                    created_date=expense_data.get('created_date', expense_data.get('timestamp', int(time.time() * 1000))),
-                    modified_date=expense_data.get('modified_date', expense_data.get('timestamp', int(time.time() * 1000)))
-                )
-                expense_objects.append(expense_obj)
-            except (ValueError, TypeError) as e:
-                self.log_error(f"Skipping invalid expense data: {expense_data}. Error: {e}")
+        for i, expense_data in enumerate(expenses):
+            if not valid[i]:
+                log_error("Skipping invalid expense data: %s. Error: invalid amount", expense_data)
+                continue
+            expense_objects.append(expense(
+                name=expense_data.get('name', expense_data.get('description', '')),
+                amount=int(cents[i]),
+                category=expense_data.get('category', expense_data.get('category_id', 1)),
+                note=expense_data.get('note', ''),
+                created_date=expense_data.get('created_date', expense_data.get('timestamp', now_ms)),
+                modified_date=expense_data.get('modified_date', expense_data.get('timestamp', now_ms))
+            ))
 
         if expense_objects:
             self.log_info(f"Adding {len(expense_objects)} expense records...")
-            sqlite_utils.insert_rows_to_remote_db(
-                expense_objects, "expense_id", table_name, db_path, app_name, self.env_controller
-            )
+            self._bulk_insert(expense_objects, table_name, db_path)
 
     def _add_random_expenses(self, count: int, db_path: str, table_name: str, app_name: str) -> None:
         """Add random expense records."""
         self.log_info(f"Adding {count} random expense records...")
-        expense_objects = []
         descriptions = ["Groceries", "Dinner", "Coffee", "Movie Tickets", "Gas", "Parking"]
-        for _ in range(count):
-            timestamp = int(time.time() * 1000) - random.randint(0, 30 * 24 * 3600 * 1000)  # within last 30 days
-            expense_obj = sqlite_schema_utils.Expense(
-                name=random.choice(descriptions),
-                amount=random.randint(100, 10000),  # $1.00 to $100.00
-                category=random.randint(1, 5),
+        rng = np.random.default_rng()
+        name_idx = rng.integers(0, len(descriptions), count)
+        amounts = rng.integers(100, 10001, count)  # $1.00 to $100.00
+        categories = rng.integers(1, 6, count)
+        offsets = rng.integers(0, 30 * 24 * 3600 * 1000 + 1, count)  # within last 30 days
+        timestamps = int(time.time() * 1000) - offsets
+        expense = sqlite_schema_utils.Expense  # Bound once for the comprehension
+        expense_objects = [
+            expense(
+                name=descriptions[name_idx[i]],
+                amount=int(amounts[i]),
+                category=int(categories[i]),
                 note='',
-                created_date=timestamp,
-                modified_date=timestamp
+                created_date=int(timestamps[i]),
+                modified_date=int(timestamps[i])
             )
-            expense_objects.append(expense_obj)
+            for i in range(count)
+        ]
 
         if expense_objects:
+            self._bulk_insert(expense_objects, table_name, db_path)
+
+    def _bulk_insert(self, rows: List[sqlite_schema_utils.Expense], table_name: str, db_path: str) -> None:
+        """Insert rows directly on the device in one transaction.
+
+        Large imports instead rebuild the database locally and push it back.
+        """
+        if len(rows) > _BULK_REPLACE_DB_THRESHOLD:
             sqlite_utils.insert_rows_to_remote_db(
-                expense_objects, "expense_id", table_name, db_path, app_name, self.env_controller
+                rows, "expense_id", table_name, db_path, _APP_NAME, self.env_controller
             )
+            return
+        self._exec_sqlite(db_path, f"{WRITE_PRAGMAS} {build_batch_insert_sql(rows, table_name, 'expense_id')}")
 
     def _relaunch_app(self, app_name: str) -> None:
-        """Relaunch the app to refresh data."""
+        """Relaunch the app to refresh data.
+
+        The app was stopped by _initialize_database, so it is only launched.
+        """
         self.log_info(f"Relaunching {app_name} to reflect changes...")
-        adb_utils.close_app(app_name, self.env_controller)
-        time.sleep(1)
         adb_utils.launch_app(app_name, self.env_controller)
-        time.sleep(2) 
\ No newline at end of file
+        self._wait_for_app_ready(_PACKAGE_NAME) 
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""Tests for expense amount parsing."""
+
+import math
+
+from absl.testing import absltest
+
+from emulator_init.modules import expense_configurator
+
+
+class ParseAmountTest(absltest.TestCase):
+    
+    def test_numbers_and_numeric_strings(self):
+        self.assertEqual(expense_configurator._parse_amount(12), 12.0)
+        self.assertEqual(expense_configurator._parse_amount('12.5'), 12.5)
+    
+    def test_invalid_values_are_nan(self):
+        for value in ('twelve', None, '', [1]):
+            with self.subTest(value=value):
+                self.assertTrue(math.isnan(expense_configurator._parse_amount(value)))
+
+
+if __name__ == '__main__':
+    absltest.main()
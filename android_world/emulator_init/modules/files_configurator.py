@@ -1,9 +1,16 @@
 """Files configuration for Android emulator."""
 
+import base64
+import io
 import os
+import posixpath
 import random
+import shlex
 import string
-from typing import Dict, Any, List
+import tarfile
+import tempfile
+import time
+from typing import Dict, Any, List, Tuple
 
 from android_world.env import adb_utils
 from android_world.utils import file_utils
@@ -11,9 +18,38 @@ from android_world.utils import file_utils
 from .base_configurator import BaseConfigurator
 
 
+# Base storage path for Android emulator
+_BASE_PATH = '/storage/emulated/0'
+
+# Printed by a batched command that failed, followed by its description.
+_FAILED_MARKER = 'FAILED: '
+
+# Device-side staging path for archives of generated files.
+_FILES_ARCHIVE = '/data/local/tmp/files_batch.tar'
+
+
 class FilesConfigurator(BaseConfigurator):
     """Configurator for Files app with predefined file structure."""
     
+    __slots__ = ()
+    
+    parallel_safe = True
+    
+    @classmethod
+    def device_paths(cls, config: Dict[str, Any]) -> Tuple[str, ...]:
+        """The folders and files the configured operations touch."""
+        relative_paths = list(config.get('clear_folders', []))
+        relative_paths += config.get('create_folders', [])
+        relative_paths += [
+            posixpath.join(file_info.get('folder', ''), file_info.get('name', ''))
+            for file_info in config.get('add_files', [])
+        ]
+        for copy_info in config.get('copy_files', []):
+            relative_paths += [copy_info.get('source', ''), copy_info.get('destination', '')]
+        if config.get('add_random_files', False):
+            relative_paths += config.get('random_file_folders', ['Download', 'Documents', 'Pictures'])
+        return tuple(sorted({posixpath.join(_BASE_PATH, path).rstrip('/') for path in relative_paths}))
+    
     @property
     def module_name(self) -> str:
         return "Files"
@@ -29,27 +65,28 @@ class FilesConfigurator(BaseConfigurator):
             adb_utils.set_root_if_needed(self.env_controller)
             
             # Base storage path for Android emulator
-            base_path = '/storage/emulated/0'
+            base_path = _BASE_PATH
             
+            # Each phase runs as a single adb shell invocation, in order
             # Clear folders if requested
             if self.config.get('clear_folders'):
-                self._clear_folders(base_path)
+                self._run_phase('clearing folder', self._clear_folders(base_path))
             
             # Create folders
             if self.config.get('create_folders'):
-                self._create_folders(base_path)
+                self._run_phase('creating folder', self._create_folders(base_path))
             
             # Add files
             if self.config.get('add_files'):
-                self._add_files(base_path)
+                self._push_archive('creating file', self._add_files(), base_path)
             
             # Copy files if requested
             if self.config.get('copy_files'):
-                self._copy_files(base_path)
+                self._run_phase('copying file', self._copy_files(base_path))
             
             # Add random files if requested
             if self.config.get('add_random_files', False):
-                self._add_random_files(base_path)
+                self._push_archive('creating random file', self._add_random_files(), base_path)
             
             return True
             
@@ -57,108 +94,133 @@ class FilesConfigurator(BaseConfigurator):
             self.log_error(f"Failed to configure Files app: {e}")
             return False
     
-    def _clear_folders(self, base_path: str) -> None:
-        """Clear specified folders."""
+    def _run_phase(self, action: str, items: List[Tuple[str, str]]) -> None:
+        """Run a phase's commands in one adb shell call and log failed items.
+        
+        Args:
+            action: What the commands do, for log messages
+            items: (description, shell command) pairs
+        """
+        if not items:
+            return
+        commands = [
+            f"{{ {command}; }} || echo {shlex.quote(_FAILED_MARKER + label)}"
+            for label, command in items
+        ]
+        output = self.run_shell_batch(commands, separator='; ')
+        failed = [
+            line[len(_FAILED_MARKER):] for line in output.splitlines()
+            if line.startswith(_FAILED_MARKER)
+        ]
+        for label in failed:
+            self.log_error(f'Error {action}: {label}')
+        self.log_info(f'Done {action}: {len(items) - len(failed)}/{len(items)} succeeded')
+    
+    def _push_archive(self, action: str, files: List[Tuple[str, bytes]], base_path: str) -> None:
+        """Write files by pushing them as one tar archive and extracting it.
+        
+        This costs two adb calls (push + extract) regardless of the file count.
+        
+        Args:
+            action: What the files are, for log messages
+            files: (path relative to base_path, content) pairs
+            base_path: Device directory the archive is extracted into
+        """
+        if not files:
+            return
+        mtime = int(time.time())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_tar = os.path.join(temp_dir, 'files_batch.tar')
+            with tarfile.open(local_tar, 'w') as tar:
+                for relative_path, data in files:
+                    info = tarfile.TarInfo(relative_path)
+                    info.size = len(data)
+                    info.mode = 0o644
+                    info.mtime = mtime
+                    tar.addfile(info, io.BytesIO(data))
+            file_utils.copy_data_to_device(local_tar, _FILES_ARCHIVE, self.env_controller)
+        
+        output = self.run_shell_batch([
+            f'tar -xf {_FILES_ARCHIVE} -C {shlex.quote(base_path)}',
+            f'rm {_FILES_ARCHIVE}',
+            'echo OK',
+        ])
+        if output.strip().endswith('OK'):
+            self.log_info(f'Done {action}: {len(files)}/{len(files)} succeeded')
+        else:
+            self.log_error(f'Error {action}: extracting archive failed: {output.strip()}')
+    
+    def _clear_folders(self, base_path: str) -> List[Tuple[str, str]]:
+        """Commands clearing specified folders, creating missing ones."""
+        items = []
         for folder_path in self.config.get('clear_folders', []):
             full_path = os.path.join(base_path, folder_path)
-            self.log_info(f'Clearing folder: {full_path}')
-            try:
-                if file_utils.check_directory_exists(full_path, self.env_controller):
-                    file_utils.clear_directory(full_path, self.env_controller)
-                    self.log_info(f'Successfully cleared folder: {full_path}')
-                else:
-                    self.log_warning(f'Folder does not exist, creating it: {full_path}')
-                    file_utils.mkdir(full_path, self.env_controller)
-            except Exception as e:
-                self.log_error(f'Error clearing folder {full_path}: {e}')
+            quoted = shlex.quote(full_path)
+            items.append((full_path, f'mkdir -p {quoted} && rm -rf {quoted}/*'))
+        return items
     
-    def _create_folders(self, base_path: str) -> None:
-        """Create folders."""
+    def _create_folders(self, base_path: str) -> List[Tuple[str, str]]:
+        """Commands creating folders."""
+        items = []
         for folder_path in self.config.get('create_folders', []):
             full_path = os.path.join(base_path, folder_path)
-            self.log_info(f'Creating folder: {full_path}')
-            try:
-                file_utils.mkdir(full_path, self.env_controller)
-                self.log_info(f'Successfully created folder: {full_path}')
-            except Exception as e:
-                self.log_error(f'Error creating folder {full_path}: {e}')
+            items.append((full_path, f'mkdir -p {shlex.quote(full_path)}'))
+        return items
     
-    def _add_files(self, base_path: str) -> None:
-        """Add files."""
+    def _add_files(self) -> List[Tuple[str, bytes]]:
+        """Files to add, as (relative path, content) pairs."""
+        files = []
         for file_info in self.config.get('add_files', []):
             file_name = file_info.get('name')
             folder_path = file_info.get('folder', '')
-            content = file_info.get('content', '')
+            # Like file_utils.create_file, fill empty files with random text
+            content = file_info.get('content', '') or ''.join(
+                random.choices(string.ascii_letters + string.digits, k=20)
+            )
             
             if not file_name:
                 continue
-                
-            full_folder_path = os.path.join(base_path, folder_path)
             
-            try:
-                self.log_info(f'Creating file: {file_name} in {full_folder_path}')
-                if not file_utils.check_directory_exists(full_folder_path, self.env_controller):
-                    self.log_info(f'Folder does not exist, creating it: {full_folder_path}')
-                    file_utils.mkdir(full_folder_path, self.env_controller)
-                file_utils.create_file(file_name, full_folder_path, self.env_controller, content)
-                self.log_info(f'Successfully created file: {file_name}')
-            except Exception as e:
-                self.log_error(f'Error creating file {file_name}: {e}')
+            # Newline-terminated like files written with echo
+            files.append((os.path.join(folder_path, file_name), f'{content}\n'.encode('utf-8')))
+        return files
     
-    def _copy_files(self, base_path: str) -> None:
-        """Copy files."""
+    def _copy_files(self, base_path: str) -> List[Tuple[str, str]]:
+        """Commands copying files, creating destination folders as needed."""
+        items = []
         for copy_info in self.config.get('copy_files', []):
             source_path = copy_info.get('source')
             destination_path = copy_info.get('destination')
             
             if not source_path or not destination_path:
                 continue
-                
+            
             full_source_path = os.path.join(base_path, source_path)
             full_destination_path = os.path.join(base_path, destination_path)
-            
-            try:
-                self.log_info(f'Copying file from {full_source_path} to {full_destination_path}')
-                # First make sure the destination directory exists
-                dest_dir = os.path.dirname(full_destination_path)
-                if not file_utils.check_directory_exists(dest_dir, self.env_controller):
-                    file_utils.mkdir(dest_dir, self.env_controller)
-                
-                # Execute the copy command using adb
-                adb_utils.issue_generic_request(
-                    ["shell", "cp", full_source_path, full_destination_path], 
-                    self.env_controller
-                )
-                self.log_info('Successfully copied file')
-            except Exception as e:
-                self.log_error(f'Error copying file: {e}')
+            dest_dir = os.path.dirname(full_destination_path)
+            items.append((
+                f'{full_source_path} -> {full_destination_path}',
+                f'mkdir -p {shlex.quote(dest_dir)} && '
+                f'cp {shlex.quote(full_source_path)} {shlex.quote(full_destination_path)}',
+            ))
+        return items
     
-    def _add_random_files(self, base_path: str) -> None:
-        """Add random files."""
+    def _add_random_files(self) -> List[Tuple[str, bytes]]:
+        """Random files to add, as (relative path, content) pairs."""
         file_count = self.config.get('random_file_count', 5)
         folders = self.config.get('random_file_folders', ['Download', 'Documents', 'Pictures'])
+        extensions = ['.txt', '.md', '.log', '.csv', '.json']
         
         self.log_info(f'Adding {file_count} random files...')
         
-        for i in range(file_count):
-            folder = random.choice(folders)
-            full_folder_path = os.path.join(base_path, folder)
-            
-            # Ensure folder exists
-            if not file_utils.check_directory_exists(full_folder_path, self.env_controller):
-                try:
-                    file_utils.mkdir(full_folder_path, self.env_controller)
-                except Exception as e:
-                    self.log_error(f'Error creating folder {full_folder_path}: {e}')
-                    continue
-            
-            # Generate random file with random extension
-            extensions = ['.txt', '.md', '.log', '.csv', '.json']
-            file_name = f"random_file_{i+1}{random.choice(extensions)}"
-            content = ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(100))
-            
-            try:
-                self.log_info(f'Creating random file: {file_name} in {full_folder_path}')
-                file_utils.create_file(file_name, full_folder_path, self.env_controller, content)
-            except Exception as e:
-                self.log_error(f'Error creating random file {file_name}: {e}') 
\ No newline at end of file
+        chosen_folders = random.choices(folders, k=file_count)
+        chosen_extensions = random.choices(extensions, k=file_count)
+        
+        # 75 random bytes encode to exactly 100 base64 characters
+        return [
+            (
+                f"{chosen_folders[i]}/random_file_{i+1}{chosen_extensions[i]}",
+                base64.b64encode(os.urandom(75)) + b'\n',
+            )
+            for i in range(file_count)
+        ]
@@ -1,19 +1,51 @@
 """Gallery configuration for Android emulator."""
 
+import functools
+import io
 import os
-import time
-from typing import Dict, Any, List
+import shlex
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
 
 from android_world.env import adb_utils
 from android_world.utils import file_utils
 from PIL import Image, ImageDraw, ImageFont
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import get_font_path, trigger_media_scan
+
+
+_GALLERY_PATH = "/storage/emulated/0/DCIM"
+
+# Guards text rendering with the shared cached fonts.
+_FONT_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=32)
+def _load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Load a font once per (path, size)."""
+    return ImageFont.truetype(path, size)
 
 
 class GalleryConfigurator(BaseConfigurator):
     """Configurator for Gallery images."""
     
+    __slots__ = ()
+    
+    parallel_safe = True
+    
+    # Upper bound on concurrent image pushes; each one waits on an ADB round-trip.
+    _MAX_PUSH_WORKERS = 4
+    
+    @classmethod
+    def device_paths(cls, config: Dict[str, Any]) -> Tuple[str, ...]:
+        """The gallery directory and the directories of configured images."""
+        paths = {_GALLERY_PATH}
+        paths.update(image_config.get('path', _GALLERY_PATH) for image_config in config.get('add_images', []))
+        return tuple(sorted(paths))
+    
     @property
     def module_name(self) -> str:
         return "Gallery"
@@ -26,7 +58,7 @@ class GalleryConfigurator(BaseConfigurator):
         
         try:
             # Gallery data path - using DCIM as default path
-            gallery_path = "/storage/emulated/0/DCIM"
+            gallery_path = _GALLERY_PATH
             
             # Clear existing images if specified
             if self.config.get('clear_images', False):
@@ -43,11 +75,22 @@ class GalleryConfigurator(BaseConfigurator):
             self.log_error(f"Failed to configure Gallery: {e}")
             return False
     
+    def _ensure_dir(self, path: str) -> None:
+        """Create a device directory unless it is already known to exist."""
+        if self._is_known_path(path):
+            return
+        adb_utils.issue_generic_request(['shell', f'mkdir -p {shlex.quote(path)}'], self.env_controller)
+        self._remember_path(path)
+    
     def _clear_images(self, gallery_path: str) -> None:
         """Clear existing images."""
         try:
             self.log_info("Clearing gallery images...")
-            adb_utils.issue_generic_request(['shell', f'rm -rf {gallery_path}/*'], self.env_controller)
+            adb_utils.issue_generic_request(['shell', f'rm -rf {shlex.quote(gallery_path)}/*'], self.env_controller)
+            # Directories below the gallery directory are gone now; only the
+            # gallery directory itself remains
+            self.invalidate_paths([gallery_path])
+            self._remember_path(gallery_path)
             self.log_info("Successfully cleared gallery images")
         except Exception as e:
             self.log_error(f"Failed to clear gallery images: {e}")
@@ -56,92 +99,96 @@ class GalleryConfigurator(BaseConfigurator):
         """Add images to gallery."""
         self.log_info(f"Preparing to add {len(images)} images to gallery...")
         
+        # Resolve targets first so directories are created in one shell call
+        # instead of a mkdir per image
+        targets = []
         for image_config in images:
-            try:
-                filename = image_config.get('filename')
-                if not filename:
-                    self.log_warning("Image configuration missing filename, skipping")
-                    continue
-                
-                # Check image path
-                path = image_config.get('path', gallery_path)
-                
-                # Handle image source
-                if 'text' in image_config:
-                    # Create image from text
-                    self._create_text_image(image_config.get('text', ''), path, filename)
-                elif 'src' in image_config:
-                    # Copy existing image
-                    src_path = image_config.get('src')
-                    if os.path.exists(src_path):
-                        self._copy_image_to_device(src_path, path, filename)
-                    else:
-                        self.log_warning(f"Source image does not exist: {src_path}, skipping")
-                else:
+            filename = image_config.get('filename')
+            if not filename:
+                self.log_warning("Image configuration missing filename, skipping")
+                continue
+            if 'text' not in image_config:
+                if 'src' not in image_config:
                     self.log_warning(f"Image {filename} missing text or source path configuration, skipping")
-                    
-            except Exception as e:
-                self.log_error(f"Failed to add image {filename}: {e}")
+                    continue
+                if not os.path.exists(image_config['src']):
+                    self.log_warning(f"Source image does not exist: {image_config['src']}, skipping")
+                    continue
+            targets.append((image_config, image_config.get('path', gallery_path), filename))
         
-        # Trigger media scan to update gallery
-        try:
-            self.log_info("Triggering media scan to update gallery...")
-            scan_cmd = 'am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d file:///storage/emulated/0/DCIM'
-            adb_utils.issue_generic_request(['shell', scan_cmd], self.env_controller)
+        if targets:
+            # Pushes and shell redirects truncate existing files, so only the
+            # directories need preparing
+            new_dirs = sorted(
+                path for path in {path for _, path, _ in targets} if not self._is_known_path(path)
+            )
+            if new_dirs:
+                commands = [f'mkdir -p {shlex.quote(path)}' for path in new_dirs]
+                try:
+                    self.run_shell_batch(commands, separator='; ')
+                    for path in new_dirs:
+                        self._remember_path(path)
+                except Exception as e:
+                    self.log_error(f"Failed to prepare gallery directories: {e}")
             
-            # Also scan Pictures directory
-            scan_cmd2 = 'am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d file:///storage/emulated/0/Pictures'
-            adb_utils.issue_generic_request(['shell', scan_cmd2], self.env_controller)
-            
-            # Wait for media scan to complete
-            time.sleep(1)
-            self.log_info("Media scan completed")
-        except Exception as e:
-            self.log_error(f"Failed to trigger media scan: {e}")
+            # Images are independent of each other, so push them concurrently
+            with ThreadPoolExecutor(max_workers=min(self._MAX_PUSH_WORKERS, len(targets))) as executor:
+                list(executor.map(self._add_image, targets))
+        
+        # Trigger media scan to update gallery (DCIM and Pictures)
+        self.log_info("Triggering media scan to update gallery...")
+        trigger_media_scan(
+            ['/storage/emulated/0/DCIM', '/storage/emulated/0/Pictures'],
+            self.env_controller,
+            wait_sec=self.config.get('media_scan_wait_sec', 0.0),
+        )
     
-    def _get_font_path(self) -> str:
-        """Get available font path."""
-        font_paths = [
-            "arial.ttf",
-            "Arial Unicode.ttf",
-            "Roboto-Regular.ttf",
-            "DejaVuSans-Bold.ttf",
-            "LiberationSans-Regular.ttf",
-        ]
+    def _add_image(self, target: Tuple[Dict[str, Any], str, str]) -> None:
+        """Create or copy one image on the device.
         
-        for font_name in font_paths:
-            try:
-                font_path = ImageFont.truetype(font_name).path
-                return font_path
-            except IOError:
-                continue
+        Args:
+            target: (image config, device directory, filename) tuple
+        """
+        image_config, path, filename = target
         try:
-            return ImageFont.truetype().path
-        except IOError as e:
-            raise RuntimeError("Cannot find suitable font.") from e
+            if 'text' in image_config:
+                # Create image from text
+                self._create_text_image(image_config.get('text', ''), path, filename)
+            else:
+                # Copy existing image
+                self._copy_image_to_device(image_config.get('src'), path, filename)
+        except Exception as e:
+            self.log_error(f"Failed to add image {filename}: {e}")
     
     def _create_text_image(self, text: str, path: str, filename: str, font_size: int = 24) -> None:
         """Create text image and save to device."""
         self.log_info(f"Creating text image: {filename}")
         
         # Ensure directory exists
-        adb_utils.issue_generic_request(['shell', f'mkdir -p {path}'], self.env_controller)
+        self._ensure_dir(path)
         
         try:
-            # Create text image
-            font = ImageFont.truetype(self._get_font_path(), font_size)
+            data = self._render_text_image(text, font_size)
+            self._push_bytes(data, os.path.join(path, filename))
+            self.log_info(f"Text image {filename} created and saved successfully")
+        except Exception as e:
+            self.log_error(f"Failed to create text image: {e}")
+    
+    def _render_text_image(self, text: str, font_size: int = 24) -> bytes:
+        """Render text as black on white and return the encoded PNG."""
+        # Cached fonts are shared between push threads and FreeType faces are
+        # not thread-safe, so rendering is serialized; encoding and pushes overlap
+        with _FONT_LOCK:
+            font = _load_font(get_font_path(), font_size)
             lines = text.split("\n")
             
-            # Calculate dimensions
-            max_width = 0
-            total_height = 0
-            for line in lines:
-                bbox = font.getbbox(line)
-                max_width = max(max_width, bbox[2])
-                if line.strip():  # Non-empty line
-                    total_height += bbox[3]
-                else:  # Empty line (paragraph separator)
-                    total_height += font_size // 2
+            # Calculate dimensions, measuring each line once for both passes
+            bboxes = [font.getbbox(line) for line in lines]
+            max_width = max((bbox[2] for bbox in bboxes), default=0)
+            total_height = sum(
+                bbox[3] if line.strip() else font_size // 2  # Empty line separates paragraphs
+                for line, bbox in zip(lines, bboxes)
+            )
             
             img_width = max_width + 20
             img_height = total_height + 20
@@ -152,41 +199,35 @@ class GalleryConfigurator(BaseConfigurator):
             
             # Draw text
             y_text = 10
-            for line in lines:
+            for line, bbox in zip(lines, bboxes):
                 if line.strip():
                     d.text((10, y_text), line, fill=(0, 0, 0), font=font)
-                    bbox = font.getbbox(line)
                     y_text += bbox[3]
                 else:
                     y_text += font_size // 2
-            
-            # Save to temporary location
-            temp_path = f"/tmp/{filename}"
-            img.save(temp_path)
-            
-            # Copy to device
-            full_path = os.path.join(path, filename)
-            adb_utils.issue_generic_request(['shell', f'rm -f {full_path}'], self.env_controller)
-            file_utils.copy_data_to_device(temp_path, full_path, self.env_controller)
-            
-            # Delete temporary file
-            os.remove(temp_path)
-            
-            self.log_info(f"Text image {filename} created and saved successfully")
-        except Exception as e:
-            self.log_error(f"Failed to create text image: {e}")
+        
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        return buffer.getvalue()
+    
+    def _push_bytes(self, data: bytes, full_path: str) -> None:
+        """Write bytes to a device file with one adb push from a local temporary file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = os.path.join(temp_dir, os.path.basename(full_path))
+            with open(local_path, 'wb') as local_file:
+                local_file.write(data)
+            file_utils.copy_data_to_device(local_path, full_path, self.env_controller)
     
     def _copy_image_to_device(self, src_path: str, dest_path: str, filename: str) -> None:
         """Copy image to device."""
         self.log_info(f"Copying image {src_path} to device")
         
         # Ensure directory exists
-        adb_utils.issue_generic_request(['shell', f'mkdir -p {dest_path}'], self.env_controller)
+        self._ensure_dir(dest_path)
         
         try:
             # Copy to device
             full_path = os.path.join(dest_path, filename)
-            adb_utils.issue_generic_request(['shell', f'rm -f {full_path}'], self.env_controller)
             file_utils.copy_data_to_device(src_path, full_path, self.env_controller)
             
             self.log_info(f"Image {filename} copied successfully")
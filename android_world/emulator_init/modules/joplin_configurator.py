@@ -1,6 +1,5 @@
 """Joplin configuration for Android emulator."""
 
-import os
 import random
 import time
 from typing import Dict, Any, List
@@ -8,14 +7,23 @@ import uuid
 
 from android_world.env import adb_utils
 from android_world.task_evals.utils import sqlite_schema_utils, sqlite_utils
-from android_world.utils import file_utils
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import build_insert_sql, get_installed_packages
+
+
+_DB_PATH = '/data/data/net.cozic.joplin/databases/joplin.sqlite'
+
+# Column left out of the inserted rows, by table; folder rows leave
+# deleted_time to the table default
+_EXCLUDED_COLUMNS = {'folders': 'deleted_time'}
 
 
 class JoplinConfigurator(BaseConfigurator):
     """Configurator for Joplin notes app."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "Joplin"
@@ -35,8 +43,10 @@ class JoplinConfigurator(BaseConfigurator):
             if self.config.get('clear_notes', False):
                 self._clear_notes()
             
-            # Add folders and notes
-            folder_mapping = self._add_folders()
+            # Add folders and notes; notes may also name folders that already
+            # exist, unless the tables were just cleared
+            folder_mapping = {} if self.config.get('clear_notes', False) else self._get_existing_folders()
+            folder_mapping.update(self._add_folders())
             self._add_notes(folder_mapping)
             
             # Add random notes if specified
@@ -58,42 +68,52 @@ class JoplinConfigurator(BaseConfigurator):
         package_name = 'net.cozic.joplin'
         
         try:
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if package_name not in all_packages:
+            if package_name not in get_installed_packages(self.env_controller):
                 self.log_error("Joplin app is not installed! Please install it first.")
                 return False
             
             # Ensure root permissions
             adb_utils.set_root_if_needed(self.env_controller)
             
-            # Launch app
+            # Launch app and wait for it to start
             adb_utils.launch_app(app_name, self.env_controller)
-            time.sleep(2)  # Wait for app to start
+            if not self._wait_for_foreground(package_name):
+                self.log_warning("Joplin did not reach the foreground after 5s, continuing")
             
             # Return to home screen
             adb_utils.press_home_button(self.env_controller)
-            time.sleep(1)
+            self._wait_for_foreground(package_name, timeout_s=2.0, present=False)
             
             return True
         except Exception as e:
             self.log_error(f"Error setting up Joplin app: {e}")
             return False
     
+    def _bulk_insert_sqlite(self, rows_by_table: Dict[str, List[Any]]) -> None:
+        """Insert rows into several tables in one transaction on the device.
+        
+        Args:
+            rows_by_table: Dataclass rows to insert, keyed by table name
+        """
+        inserts = ' '.join(
+            build_insert_sql(rows, table_name, _EXCLUDED_COLUMNS.get(table_name))
+            for table_name, rows in rows_by_table.items() if rows
+        )
+        if inserts:
+            self._exec_sqlite(_DB_PATH, f"BEGIN; {inserts} COMMIT;")
+    
     def _clear_notes(self) -> None:
         """Clear all existing notes and folders."""
-        db_path = '/data/data/net.cozic.joplin/databases/joplin.sqlite'
-        notes_table = 'notes'
-        notes_normalized_table = 'notes_normalized'
-        folders_table = 'folders'
         app_name = 'joplin'
         
         try:
             self.log_info("Clearing all Joplin notes and folders...")
             
-            # Clear tables - use self.env_controller instead of self.env
-            sqlite_utils.delete_all_rows_from_table(folders_table, db_path, self.env_controller)
-            sqlite_utils.delete_all_rows_from_table(notes_table, db_path, self.env_controller)
-            sqlite_utils.delete_all_rows_from_table(notes_normalized_table, db_path, self.env_controller)
+            # Clear all three tables in one transaction on the device
+            self._exec_sqlite(
+                _DB_PATH,
+                "BEGIN; DELETE FROM folders; DELETE FROM notes; DELETE FROM notes_normalized; COMMIT;"
+            )
             
             # Close app to register changes
             adb_utils.close_app(app_name, self.env_controller)
@@ -101,6 +121,26 @@ class JoplinConfigurator(BaseConfigurator):
         except Exception as e:
             self.log_error(f"Failed to clear Joplin database: {e}")
     
+    def _get_existing_folders(self) -> Dict[str, str]:
+        """Map titles of folders already in the database to their IDs, in one query."""
+        try:
+            output = self.run_shell_batch(
+                [f'sqlite3 {_DB_PATH} "SELECT id, title FROM folders;" 2>&1 || true'], check=True
+            )
+        except Exception as e:
+            self.log_warning(f"Failed to read existing Joplin folders: {e}")
+            return {}
+        if 'error' in output.lower():
+            self.log_warning(f"Failed to read existing Joplin folders: {output.strip()}")
+            return {}
+        # Rows are "id|title"; IDs are hex, so the first separator ends them
+        folder_mapping = {}
+        for line in output.splitlines():
+            folder_id, separator, title = line.partition('|')
+            if separator:
+                folder_mapping[title] = folder_id
+        return folder_mapping
+    
     def _add_folders(self) -> Dict[str, str]:
         """Add folders and return folder mapping."""
         db_path = '/data/data/net.cozic.joplin/databases/joplin.sqlite'
@@ -133,7 +173,7 @@ class JoplinConfigurator(BaseConfigurator):
             try:
                 sqlite_utils.insert_rows_to_remote_db(
                     joplin_folders,
-                    'deleted_time',
+                    _EXCLUDED_COLUMNS[folders_table],
                     folders_table,
                     db_path,
                     app_name,
@@ -141,19 +181,8 @@ class JoplinConfigurator(BaseConfigurator):
                 )
                 self.log_info(f"Successfully added {added_folders} folders to Joplin")
                 
-                # Get folder ID mapping
-                try:
-                    with file_utils.tmp_directory_from_device(os.path.dirname(db_path), self.env_controller) as local_db_directory:
-                        local_db_path = os.path.join(local_db_directory, os.path.split(db_path)[1])
-                        folder_info = sqlite_utils.execute_query(
-                            f"SELECT * FROM {folders_table};",
-                            local_db_path,
-                            sqlite_schema_utils.JoplinFolder,
-                        )
-                        folder_mapping = {folder.title: folder.id for folder in folder_info}
-                except Exception as e:
-                    self.log_error(f"Failed to get folder IDs: {e}")
-                    folder_mapping = {}
+                # Folder IDs are generated client-side, so no need to read them back
+                folder_mapping = {folder.title: folder.id for folder in joplin_folders}
             except Exception as e:
                 self.log_error(f"Failed to add folders to Joplin: {e}")
         else:
@@ -163,7 +192,6 @@ class JoplinConfigurator(BaseConfigurator):
         
     def _add_notes(self, folder_mapping: Dict[str, str]) -> None:
         """Add notes to folders."""
-        db_path = '/data/data/net.cozic.joplin/databases/joplin.sqlite'
         notes_table = 'notes'
         notes_normalized_table = 'notes_normalized'
         folders_table = 'folders'
@@ -177,6 +205,16 @@ class JoplinConfigurator(BaseConfigurator):
             self.log_info("No notes to add")
             return
             
+        # Folders referenced by notes but not created yet; they get client-side
+        # IDs now and are inserted in the same transaction as the notes
+        missing_folders = []
+        for note_data in notes_to_add:
+            folder_name = note_data.get('folder', '')
+            if folder_name and folder_name not in folder_mapping:
+                new_folder = sqlite_schema_utils.JoplinFolder(title=folder_name)
+                folder_mapping[folder_name] = new_folder.id
+                missing_folders.append(new_folder)
+        
         joplin_notes = []
         for note_data in notes_to_add:
             try:
@@ -187,35 +225,6 @@ class JoplinConfigurator(BaseConfigurator):
                 folder_name = note_data.get('folder', '')
                 parent_id = folder_mapping.get(folder_name, '') if folder_name else ''
                 
-                # If folder doesn't exist, create it
-                if folder_name and not parent_id:
-                    new_folder = sqlite_schema_utils.JoplinFolder(title=folder_name)
-                    try:
-                        sqlite_utils.insert_rows_to_remote_db(
-                            [new_folder],
-                            'deleted_time',
-                            folders_table,
-                            db_path,
-                            app_name,
-                            self.env_controller  # Use self.env_controller instead of self.env
-                        )
-                        self.log_info(f"Created new folder for note: {folder_name}")
-                        
-                        # Update folder mapping
-                        folder_mapping.clear()
-                        with file_utils.tmp_directory_from_device(os.path.dirname(db_path), self.env_controller) as local_db_directory:
-                            local_db_path = os.path.join(local_db_directory, os.path.split(db_path)[1])
-                            folder_info = sqlite_utils.execute_query(
-                                f"SELECT * FROM {folders_table};",
-                                local_db_path,
-                                sqlite_schema_utils.JoplinFolder,
-                            )
-                            folder_mapping = {folder.title: folder.id for folder in folder_info}
-                        parent_id = folder_mapping.get(folder_name, '')
-                    except Exception as e:
-                        self.log_error(f"Failed to create new folder '{folder_name}': {e}")
-                        parent_id = ''
-                
                 # Create note object
                 current_time = int(time.time() * 1000)
                 note = sqlite_schema_utils.JoplinNote(
@@ -239,16 +248,6 @@ class JoplinConfigurator(BaseConfigurator):
         
         if joplin_notes:
             try:
-                # Insert notes to notes table
-                sqlite_utils.insert_rows_to_remote_db(
-                    joplin_notes,
-                    None,
-                    notes_table,
-                    db_path,
-                    app_name,
-                    self.env_controller  # Use self.env_controller instead of self.env
-                )
-                
                 # Create normalized notes for search
                 normalized_notes = []
                 for note in joplin_notes:
@@ -263,16 +262,16 @@ class JoplinConfigurator(BaseConfigurator):
                     )
                     normalized_notes.append(normalized_note)
                 
-                # Insert normalized notes
-                sqlite_utils.insert_rows_to_remote_db(
-                    normalized_notes,
-                    None,
-                    notes_normalized_table,
-                    db_path,
-                    app_name,
-                    self.env_controller  # Use self.env_controller instead of self.env
-                )
+                # Insert missing folders, notes and normalized notes in one transaction
+                adb_utils.close_app(app_name, self.env_controller)  # Written in place, so stop the app
+                self._bulk_insert_sqlite({
+                    folders_table: missing_folders,
+                    notes_table: joplin_notes,
+                    notes_normalized_table: normalized_notes,
+                })
                 
+                for folder in missing_folders:
+                    self.log_info(f"Created new folder for note: {folder.title}")
                 self.log_info(f"Successfully added {added_notes} notes to Joplin")
             except Exception as e:
                 self.log_error(f"Failed to add notes to Joplin database: {e}")
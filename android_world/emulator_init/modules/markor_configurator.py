@@ -1,19 +1,42 @@
 """Markor configuration for Android emulator."""
 
-import datetime
 import os
 import random
+import shlex
+import string
+import tempfile
+from datetime import date
 from typing import Dict, Any, List
 
-from android_world.env import adb_utils
 from android_world.utils import file_utils
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import get_installed_packages
+
+
+# Device directory holding Markor's notes
+_MARKOR_ROOT = '/storage/emulated/0/Documents/Markor'
+
+# Random content for notes
+_TEMPLATE_TITLES = (
+    "Meeting Notes", "Project Ideas", "Shopping List",
+    "Travel Plans", "Books to Read", "Recipes", "Daily Journal",
+)
+_LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Donec auctor, nisl eget ultricies "
+    "lacinia, nisl nisl aliquam nisl, eget aliquam nisi nisl eget nisl."
+)
 
 
 class MarkorConfigurator(BaseConfigurator):
     """Configurator for Markor note-taking app."""
     
+    __slots__ = ()
+    
+    parallel_safe = True
+    
+    _DEVICE_PATHS = (_MARKOR_ROOT,)
+    
     @property
     def module_name(self) -> str:
         return "Markor"
@@ -33,18 +56,22 @@ class MarkorConfigurator(BaseConfigurator):
             if self.config.get('clear_notes', False):
                 self._clear_notes()
             
-            # Add folders
-            if self.config.get('add_folders'):
-                self._add_folders()
-            
-            # Add notes
-            notes_to_add = self.config.get('add_notes', [])
-            if notes_to_add:
-                self._add_notes(notes_to_add)
-            
-            # Add random notes if specified
-            if self.config.get('add_random_notes', False):
-                self._add_random_notes()
+            # Folders and notes are staged in a local tree and pushed at once
+            with tempfile.TemporaryDirectory() as staging_dir:
+                # Add folders
+                if self.config.get('add_folders'):
+                    self._add_folders(staging_dir)
+                
+                # Add notes
+                notes_to_add = self.config.get('add_notes', [])
+                if notes_to_add:
+                    self._add_notes(notes_to_add, staging_dir)
+                
+                # Add random notes if specified
+                if self.config.get('add_random_notes', False):
+                    self._add_random_notes(staging_dir)
+                
+                self._push_staged_tree(staging_dir)
             
             return True
             
@@ -58,58 +85,101 @@ class MarkorConfigurator(BaseConfigurator):
         
         try:
             # Check if app is installed
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if package_name not in all_packages:
+            if package_name not in get_installed_packages(self.env_controller):
                 self.log_warning("Markor app is not installed! Skipping configuration.")
                 return False
             
             # Ensure Markor directory exists
-            markor_data_path = '/storage/emulated/0/Documents/Markor'
-            if not file_utils.check_directory_exists(markor_data_path, self.env_controller):
-                self.log_info(f'Creating Markor directory: {markor_data_path}')
-                try:
-                    file_utils.mkdir(markor_data_path, self.env_controller)
-                    if not file_utils.check_directory_exists(markor_data_path, self.env_controller):
-                        self.log_error('Failed to create Markor directory.')
-                        return False
-                except Exception as e:
-                    self.log_error(f'Error creating Markor directory: {e}')
-                    return False
+            try:
+                self._ensure_dir(_MARKOR_ROOT)
+            except Exception as e:
+                self.log_error(f'Error creating Markor directory: {e}')
+                return False
             
             return True
         except Exception as e:
             self.log_error(f"Error setting up Markor app: {e}")
             return False
     
+    def _ensure_dir(self, path: str) -> None:
+        """Make sure a device directory exists, asking the device once per path.
+        
+        Args:
+            path: Directory on the device
+            
+        Raises:
+            RuntimeError: If the directory could not be created
+        """
+        if self._is_known_path(path):
+            return
+        # mkdir -p is idempotent, so one call both creates and verifies
+        quoted = shlex.quote(path)
+        output = self.run_shell_batch([f'mkdir -p {quoted}', f'test -d {quoted}', 'echo OK'])
+        if not output.strip().endswith('OK'):
+            raise RuntimeError(f'Failed to create directory {path}.')
+        self._remember_path(path)
+    
     def _clear_notes(self) -> None:
         """Clear existing notes and folders."""
-        markor_data_path = '/storage/emulated/0/Documents/Markor'
-        
         try:
             self.log_info('Clearing existing notes and folders from Markor...')
-            file_utils.clear_directory(markor_data_path, self.env_controller)
+            file_utils.clear_directory(_MARKOR_ROOT, self.env_controller)
+            # Subfolders are gone now; only the Markor directory itself remains
+            self.invalidate_paths([_MARKOR_ROOT])
+            self._remember_path(_MARKOR_ROOT)
             self.log_info('Successfully cleared Markor notes and folders.')
         except Exception as e:
             self.log_error(f'Error clearing Markor notes: {e}')
     
-    def _add_folders(self) -> None:
-        """Add folders."""
-        markor_data_path = '/storage/emulated/0/Documents/Markor'
+    def _push_staged_tree(self, staging_dir: str) -> None:
+        """Push everything staged locally to the Markor directory in one adb push.
         
+        Args:
+            staging_dir: Local directory mirroring the Markor directory
+        """
+        if not os.listdir(staging_dir):
+            return
+        
+        # adb push skips empty directories, so create configured folders first.
+        # Device paths always use '/', whatever the host separator is
+        folders = [
+            f"{_MARKOR_ROOT}/{os.path.relpath(root, staging_dir).replace(os.sep, '/')}"
+            for root, dirs, files in os.walk(staging_dir)
+            if root != staging_dir and not dirs and not files
+        ]
+        try:
+            if folders:
+                self.run_shell_batch([f'mkdir -p {shlex.quote(folder)}' for folder in folders])
+            file_utils.copy_data_to_device(os.path.join(staging_dir, '.'), _MARKOR_ROOT, self.env_controller)
+            self.log_info('Pushed Markor folders and notes to device.')
+        except Exception as e:
+            self.log_error(f'Error pushing Markor notes: {e}')
+    
+    @staticmethod
+    def _write_note(directory: str, title: str, content: str) -> None:
+        """Write a note into the local staging tree.
+        
+        Like file_utils.create_file, empty notes get random text and content
+        ends with the newline echo would add.
+        """
+        if not content:
+            content = ''.join(random.choices(string.ascii_letters + string.digits, k=20))
+        with open(os.path.join(directory, title), 'w', encoding='utf-8') as note_file:
+            note_file.write(content + '\n')
+    
+    def _add_folders(self, staging_dir: str) -> None:
+        """Add folders to the staging tree."""
         for folder_info in self.config.get('add_folders', []):
             folder_name = folder_info.get('title')  # Changed from 'name' to 'title'
             if folder_name:
-                folder_path = os.path.join(markor_data_path, folder_name)
                 try:
                     self.log_info(f'Creating folder: {folder_name}')
-                    file_utils.mkdir(folder_path, self.env_controller)
+                    os.makedirs(os.path.join(staging_dir, folder_name), exist_ok=True)
                 except Exception as e:
                     self.log_error(f'Error creating folder {folder_name}: {e}')
     
-    def _add_notes(self, notes_to_add: List[Dict[str, Any]]) -> None:
-        """Add notes."""
-        markor_data_path = '/storage/emulated/0/Documents/Markor'
-        
+    def _add_notes(self, notes_to_add: List[Dict[str, Any]], staging_dir: str) -> None:
+        """Add notes to the staging tree."""
         for note_info in notes_to_add:
             title = note_info.get('title')
             content = note_info.get('content', '')
@@ -122,45 +192,34 @@ class MarkorConfigurator(BaseConfigurator):
             if not title.endswith('.md') and not title.endswith('.txt'):
                 title += '.md'
                 
+            note_dir = staging_dir
             if folder:
-                folder_path = os.path.join(markor_data_path, folder)
-                # Check if folder exists
-                if not file_utils.check_directory_exists(folder_path, self.env_controller):
-                    try:
-                        file_utils.mkdir(folder_path, self.env_controller)
-                    except Exception as e:
-                        self.log_error(f'Error creating folder {folder}: {e}')
-                        folder_path = markor_data_path
-                note_path = os.path.join(folder_path, title)
-            else:
-                note_path = os.path.join(markor_data_path, title)
+                try:
+                    os.makedirs(os.path.join(staging_dir, folder), exist_ok=True)
+                    note_dir = os.path.join(staging_dir, folder)
+                except Exception as e:
+                    self.log_error(f'Error creating folder {folder}: {e}')
                 
             try:
                 self.log_info(f'Creating note: {title}')
-                file_utils.create_file(title, os.path.dirname(note_path), self.env_controller, content)
+                self._write_note(note_dir, title, content)
             except Exception as e:
                 self.log_error(f'Error creating note {title}: {e}')
     
-    def _add_random_notes(self) -> None:
-        """Add random notes."""
-        markor_data_path = '/storage/emulated/0/Documents/Markor'
+    def _add_random_notes(self, staging_dir: str) -> None:
+        """Add random notes to the staging tree."""
         note_count = self.config.get('random_note_count', 5)
         
         self.log_info(f'Adding {note_count} random notes...')
         
+        today = date.today().isoformat()
+        
         for i in range(note_count):
-            # Random content for notes
-            template_titles = [
-                "Meeting Notes", "Project Ideas", "Shopping List", 
-                "Travel Plans", "Books to Read", "Recipes", "Daily Journal"
-            ]
-            
-            title = f"{random.choice(template_titles)} {i+1}.md"
-            content = f"# {title[:-3]}\n\nThis is a sample note created on {datetime.datetime.now().strftime('%Y-%m-%d')}.\n\n"
-            content += "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Donec auctor, nisl eget ultricies lacinia, nisl nisl aliquam nisl, eget aliquam nisi nisl eget nisl."
+            title = f"{random.choice(_TEMPLATE_TITLES)} {i+1}.md"
+            content = f"# {title[:-3]}\n\nThis is a sample note created on {today}.\n\n{_LOREM}"
             
             try:
                 self.log_info(f'Creating random note: {title}')
-                file_utils.create_file(title, markor_data_path, self.env_controller, content)
+                self._write_note(staging_dir, title, content)
             except Exception as e:
-                self.log_error(f'Error creating random note {title}: {e}') 
\ No newline at end of file
+                self.log_error(f'Error creating random note {title}: {e}')
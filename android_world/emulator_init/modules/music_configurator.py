@@ -2,18 +2,72 @@
 
 import os
 import random
+import re
+import shlex
+import tempfile
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 from android_world.env import adb_utils
 from android_world.task_evals.utils import user_data_generation
+from android_world.utils import file_utils
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import build_values_insert_sql, get_installed_packages, trigger_media_scan
+
+
+# Writes an MP3 to a local path; write_mp3_file_to_device wraps it with a
+# per-file push. It is private upstream, so fall back if it goes away.
+_create_test_mp3 = getattr(user_data_generation, '_create_test_mp3', None)
+
+_MUSIC_DIRECTORY = '/storage/emulated/0/Music'
+
+# Printed by the stages of _clear_music that succeeded.
+_CLEARED_DIR_MARKER = 'CLEARED_DIR'
+_CLEARED_DB_MARKER = 'CLEARED_DB'
+
+# One "Row: N key=value, key=value, ..." line of `content query` output, and
+# its fields; a value runs until the next ", key=" so it may contain commas.
+_ROW_RE = re.compile(rb'^Row:\s*\d+\s+(.*?)\s*$', re.M)
+_FIELD_RE = re.compile(rb'(\w+)=(.*?)(?=, \w+=|$)')
+
+
+def _where_in(column: str, values: List[str]) -> str:
+    """Shell-quoted `content query --where` clause matching any of the values."""
+    value_list = ', '.join("'" + value.replace("'", "''") + "'" for value in values)
+    return shlex.quote(f"{column} IN ({value_list})")
+
+
+def _parse_content_rows(output: bytes) -> List[Dict[str, Optional[str]]]:
+    """Parse `content query` output into one dict per row; NULL becomes None."""
+    return [
+        {
+            key.decode('ascii'): None if value == b'NULL' else value.decode('utf-8', errors='ignore')
+            for key, value in _FIELD_RE.findall(row.group(1))
+        }
+        for row in _ROW_RE.finditer(output)
+    ]
 
 
 class MusicConfigurator(BaseConfigurator):
     """Configurator for RetroMusic app."""
     
+    # Media library song info by title (None if not in the library), fetched
+    # at most once per title and library state, and whether this run changed
+    # anything the app shows.
+    __slots__ = ('_song_info_cache', '_mutated')
+    
+    _DEVICE_PATHS = (_MUSIC_DIRECTORY, '/data/data/code.name.monkey.retromusic')
+    
+    # Upper bound on concurrent MP3 pushes; each one waits on an ADB round-trip.
+    _MAX_PUSH_WORKERS = 4
+    
+    def __init__(self, env, config: Dict[str, Any]):
+        super().__init__(env, config)
+        self._song_info_cache = {}
+        self._mutated = False
+    
     @property
     def module_name(self) -> str:
         return "Music"
@@ -36,11 +90,12 @@ class MusicConfigurator(BaseConfigurator):
             # Add music files
             music_files = self.config.get('add_music_files', [])
             if music_files:
-                added_count = self._add_music_files(music_files)
-                self.log_info(f"Successfully added {added_count} music files")
+                added_paths = self._add_music_files(music_files)
+                self.log_info(f"Successfully added {len(added_paths)} music files")
                 
-                # Scan music directory to update media library
-                self._scan_music_directory()
+                # Scan the new files to update media library
+                self._scan_music_directory(added_paths)
+                self._song_info_cache = {}  # Library changed, refetch on next use
             
             # Create playlists
             playlists = self.config.get('add_playlists', [])
@@ -53,7 +108,8 @@ class MusicConfigurator(BaseConfigurator):
                 self._set_queue(queue_songs)
             
             # Restart app to ensure changes take effect
-            self._restart_music_app()
+            if self._mutated:
+                self._restart_music_app()
             
             return True
             
@@ -61,27 +117,35 @@ class MusicConfigurator(BaseConfigurator):
             self.log_error(f"Failed to configure music app: {e}")
             return False
     
+    def _needs_app_databases(self) -> bool:
+        """Whether the configuration writes to RetroMusic's own databases."""
+        return bool(
+            self.config.get('clear_music') or self.config.get('add_playlists') or self.config.get('set_queue')
+        )
+    
     def _setup_music_app(self) -> bool:
         """Setup and verify music app."""
         app_name = 'retro music'
         package_name = 'code.name.monkey.retromusic'
         
         try:
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if package_name not in all_packages:
+            if package_name not in get_installed_packages(self.env_controller):
                 self.log_error("Retro Music app is not installed! Please install it first.")
                 return False
             
             # Ensure root permissions
             adb_utils.set_root_if_needed(self.env_controller)
             
-            # Launch app
-            adb_utils.launch_app(app_name, self.env_controller)
-            time.sleep(2)  # Wait for app to start
-            
-            # Return to home screen
-            adb_utils.press_home_button(self.env_controller)
-            time.sleep(1)
+            # Launch the app once so it creates its databases; pushing music
+            # files alone doesn't need it
+            if self._needs_app_databases():
+                adb_utils.launch_app(app_name, self.env_controller)
+                if not self._wait_for_foreground(package_name):
+                    self.log_warning("RetroMusic did not reach the foreground after 5s, continuing")
+                
+                # Return to home screen
+                adb_utils.press_home_button(self.env_controller)
+                self._wait_for_foreground(package_name, timeout_s=2.0, present=False)
             
             return True
         except Exception as e:
@@ -89,106 +153,262 @@ class MusicConfigurator(BaseConfigurator):
             return False
     
     def _clear_music(self) -> None:
-        """Clear existing music files and playlists."""
-        music_directory = '/storage/emulated/0/Music'
+        """Clear existing music files and playlists in one shell call."""
         playlist_db_path = '/data/data/code.name.monkey.retromusic/databases/playlist.db'
         
         try:
             self.log_info("Clearing all existing music files and playlists")
             
-            # Clear music directory
-            clear_dir_cmd = ['shell', f'rm -rf {music_directory}/*']
-            adb_utils.issue_generic_request(clear_dir_cmd, self.env_controller)
-            self.log_info("Cleared device music directory")
-            
-            # Ensure music directory exists
-            mkdir_cmd = ['shell', f'mkdir -p {music_directory}']
-            adb_utils.issue_generic_request(mkdir_cmd, self.env_controller)
+            # Each stage echoes a marker on success; the DB stage runs even if
+            # clearing the directory failed
+            output = self.run_shell_batch([
+                f'rm -rf {_MUSIC_DIRECTORY}/* && mkdir -p {_MUSIC_DIRECTORY} && echo {_CLEARED_DIR_MARKER}',
+                f'sqlite3 {playlist_db_path} '
+                f'"BEGIN; DELETE FROM PlaylistEntity; DELETE FROM SongEntity; COMMIT;" && echo {_CLEARED_DB_MARKER}',
+            ], separator='; ')
             
-            # Clear playlist databases
-            self._clear_playlist_dbs(playlist_db_path)
-            self.log_info("Cleared playlist databases")
+            if _CLEARED_DIR_MARKER in output or _CLEARED_DB_MARKER in output:
+                self._mutated = True
+            if _CLEARED_DIR_MARKER in output:
+                self.log_info("Cleared device music directory")
+            else:
+                self.log_error("Failed to clear device music directory")
+            if _CLEARED_DB_MARKER in output:
+                self.log_info("Cleared playlist databases")
+            else:
+                self.log_error(f"Failed to clear playlist database tables: {output.strip()}")
         except Exception as e:
             self.log_error(f"Failed to clear music files and playlists: {e}")
     
-    def _add_music_files(self, music_files: List[Dict[str, Any]]) -> int:
-        """Add music files to device."""
-        music_directory = '/storage/emulated/0/Music'
-        added_files = 0
+    def _add_music_files(self, music_files: List[Dict[str, Any]]) -> List[str]:
+        """Add music files to device.
         
+        Files are generated in a local directory and sent with one adb push;
+        without a local MP3 writer they are pushed one by one, concurrently.
+        
+        Returns:
+            Device paths of the files written
+        """
+        by_file_name = {}
         for music_file in music_files:
+            title = music_file.get('title', '')
+            file_name = f"{title}.mp3" if title else f"music_{random.randint(1, 1000)}.mp3"
+            by_file_name.setdefault(file_name, []).append(music_file)
+        
+        if _create_test_mp3 is not None:
+            added_paths = self._bulk_push_music_files(by_file_name)
+        elif not self.env:
+            # Fallback: if we only have env_controller, we can't use write_mp3_file_to_device
+            self.log_error("Cannot add music files: full env object not available")
+            added_paths = []
+        else:
+            # write_mp3_file_to_device stages each file under its basename, so
+            # entries sharing a file name run in order within one task
+            def add_group(item) -> bool:
+                file_name, group = item
+                return sum(self._add_music_file(music_file, file_name) for music_file in group) > 0
+            
+            with ThreadPoolExecutor(max_workers=min(self._MAX_PUSH_WORKERS, len(by_file_name))) as executor:
+                added = list(executor.map(add_group, by_file_name.items()))
+            added_paths = [
+                f'{_MUSIC_DIRECTORY}/{file_name}' for file_name, ok in zip(by_file_name, added) if ok
+            ]
+        
+        if added_paths:
+            self._mutated = True
+        return added_paths
+    
+    @staticmethod
+    def _mp3_tags(music_file: Dict[str, Any]) -> Tuple[str, str, int]:
+        """(title, artist, duration in ms) for a music file entry."""
+        return (
+            music_file.get('title', ''),
+            music_file.get('artist', 'Unknown Artist'),
+            music_file.get('duration_ms', random.randint(3 * 60 * 1000, 5 * 60 * 1000)),
+        )
+    
+    def _log_music_file_error(self, music_file: Dict[str, Any], error: Exception) -> None:
+        """Log a failed music file, quietly when the file name was the problem."""
+        # Only log this as debug if it's due to file name issues with special characters
+        if "syntax error" in str(error).lower():
+            self.log_debug(f"Skipped music file '{music_file.get('title', 'Unknown')}' due to special characters in filename")
+        else:
+            self.log_error(f"Failed to add music file '{music_file.get('title', 'Unknown')}': {error}")
+    
+    def _bulk_push_music_files(self, by_file_name: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+        """Generate MP3 files locally and push them all with one adb push.
+        
+        Args:
+            by_file_name: Music file entries grouped by target file name; later
+                entries overwrite earlier ones, as consecutive writes would
+            
+        Returns:
+            Device paths of the files written
+        """
+        added_paths = []
+        with tempfile.TemporaryDirectory() as local_dir:
+            for file_name, group in by_file_name.items():
+                written = False
+                for music_file in group:
+                    try:
+                        title, artist, duration_ms = self._mp3_tags(music_file)
+                        _create_test_mp3(
+                            os.path.join(local_dir, file_name),
+                            artist=artist,
+                            title=title,
+                            duration_milliseconds=duration_ms,
+                        )
+                        self.log_debug(f"Added music file: {title} - {artist}")
+                        written = True
+                    except Exception as e:
+                        self._log_music_file_error(music_file, e)
+                if written:
+                    added_paths.append(f'{_MUSIC_DIRECTORY}/{file_name}')
+            
+            if not added_paths:
+                return []
             try:
-                title = music_file.get('title', '')
-                artist = music_file.get('artist', 'Unknown Artist')
-                duration_ms = music_file.get('duration_ms', random.randint(3 * 60 * 1000, 5 * 60 * 1000))
-                file_name = f"{title}.mp3" if title else f"music_{random.randint(1, 1000)}.mp3"
-                
-                # Write MP3 file to device
-                if self.env:
-                    # Use full env object if available
-                    user_data_generation.write_mp3_file_to_device(
-                        os.path.join(music_directory, file_name),
-                        self.env,
-                        title=title,
-                        artist=artist,
-                        duration_milliseconds=duration_ms
-                    )
-                else:
-                    # Fallback: if we only have env_controller, we can't use write_mp3_file_to_device
-                    self.log_error("Cannot add music files: full env object not available")
-                    break
-                
-                self.log_debug(f"Added music file: {title} - {artist}")
-                added_files += 1
+                file_utils.copy_data_to_device(
+                    os.path.join(local_dir, '.'), _MUSIC_DIRECTORY, self.env_controller
+                )
             except Exception as e:
-                # Only log this as debug if it's due to file name issues with special characters
-                if "syntax error" in str(e).lower():
-                    self.log_debug(f"Skipped music file '{music_file.get('title', 'Unknown')}' due to special characters in filename")
-                else:
-                    self.log_error(f"Failed to add music file '{music_file.get('title', 'Unknown')}': {e}")
-        
-        return added_files
+                self.log_error(f"Failed to push music files: {e}")
+                return []
+        return added_paths
     
-    def _scan_music_directory(self) -> None:
-        """Scan music directory to update media library."""
+    def _add_music_file(self, music_file: Dict[str, Any], file_name: str) -> bool:
+        """Write one MP3 file to the music directory.
+        
+        Returns:
+            True if the file was written, False otherwise
+        """
         try:
-            action = 'android.intent.action.MEDIA_SCANNER_SCAN_FILE'
-            data_uri = 'file:///storage/emulated/0/Music'
+            title, artist, duration_ms = self._mp3_tags(music_file)
             
-            adb_utils.send_android_intent(
-                command='broadcast', 
-                action=action, 
-                env=self.env_controller, 
-                data_uri=data_uri
+            # Write MP3 file to device
+            user_data_generation.write_mp3_file_to_device(
+                f'{_MUSIC_DIRECTORY}/{file_name}',
+                self.env,
+                title=title,
+                artist=artist,
+                duration_milliseconds=duration_ms
             )
             
+            self.log_debug(f"Added music file: {title} - {artist}")
+            return True
+        except Exception as e:
+            self._log_music_file_error(music_file, e)
+            return False
+    
+    def _count_indexed_music_files(self, paths: List[str]) -> int:
+        """Number of the given files known to the media library."""
+        cmd = [
+            'shell',
+            'content query --uri content://media/external/audio/media --projection _id '
+            f'--where {_where_in("_data", paths)}'
+        ]
+        response = adb_utils.issue_generic_request(cmd, self.env_controller)
+        return response.generic.output.count(b'Row:')
+    
+    def _scan_music_directory(self, paths: List[str]) -> None:
+        """Scan newly pushed music files to update media library.
+        
+        Only the given files are scanned, so the cost does not grow with the
+        music already on the device.
+        
+        Args:
+            paths: Device paths of the new files; waits until all are indexed
+        """
+        try:
+            # One shell call with a scan broadcast per file
+            trigger_media_scan(paths or [_MUSIC_DIRECTORY], self.env_controller, wait_sec=0.0)
+            
             # Close RetroMusic app
             adb_utils.close_app('retro music', self.env_controller)
+            # Wait for scan to complete, i.e. until the new files themselves
+            # are indexed; files indexed before the push do not count
+            if paths and not self._wait_until(lambda: self._count_indexed_music_files(paths) >= len(paths)):
+                self.log_warning("Media scan did not index all music files after 5s, continuing")
             self.log_info("Successfully scanned music directory, media library updated")
-            time.sleep(2)  # Wait for scan to complete
         except Exception as e:
             self.log_error(f"Failed to scan music directory: {e}")
     
+    @staticmethod
+    def _song_values(song_name: str, song_info: Optional[Dict[str, Any]], index: int, default_id: int,
+                     now: int) -> tuple:
+        """Column values shared by SongEntity and playing_queue rows.
+        
+        Args:
+            song_name: Song title
+            song_info: Media library row for the song, keyed by provider column
+                (_id, track, _data, album, artist, ...); empty if unknown
+            index: Position of the song in its list
+            default_id: Song ID to use when the song is not in the media library
+            now: Current Unix time, the default date_modified
+            
+        Returns:
+            (id, track_number, year, duration, data, date_modified, album_id,
+            album_name, artist_id, artist_name, composer, album_artist)
+        """
+        if song_info:
+            # Use real song info, read under the media provider's column names
+            def column(name: str, default: Any, convert=str) -> Any:
+                value = song_info.get(name)
+                if value is None:
+                    return default
+                try:
+                    return convert(value)
+                except ValueError:
+                    return default
+            
+            return (
+                column('_id', index + 1, int),
+                column('track', index + 1, int),
+                column('year', 2023, int),
+                column('duration', 180000, int),
+                column('_data', f"{_MUSIC_DIRECTORY}/{song_name}.mp3"),
+                column('date_modified', now, int),
+                column('album_id', 1, int),
+                column('album', 'Unknown Album'),
+                column('artist_id', 1, int),
+                column('artist', 'Unknown Artist'),
+                column('composer', ''),
+                column('album_artist', ''),
+            )
+        # Create default values
+        return (
+            default_id, index + 1, 2023, 180000, f"{_MUSIC_DIRECTORY}/{song_name}.mp3",
+            now, default_id, 'Unknown Album', default_id, 'Unknown Artist', '', '',
+        )
+    
     def _create_playlists(self, playlists: List[Dict[str, Any]]) -> None:
-        """Create playlists."""
+        """Create playlists, inserting all rows in one transaction."""
         playlist_db_path = '/data/data/code.name.monkey.retromusic/databases/playlist.db'
-        added_playlists = 0
         
         # Restart RetroMusic app
         adb_utils.launch_app('retro music', self.env_controller)
-        time.sleep(2)
+        self._wait_for_foreground('code.name.monkey.retromusic')
         
-        # Get song info map
+        # Get song info for the songs in the playlists only
         try:
-            song_info_map = self._get_song_info_map()
-            self.log_info(f"Retrieved {len(song_info_map)} songs from media library")
+            song_info_map = self._song_info(
+                song_name for playlist in playlists for song_name in playlist.get('songs', [])
+            )
+            self.log_info(f"Retrieved {sum(map(bool, song_info_map.values()))} songs from media library")
         except Exception as e:
             self.log_error(f"Failed to get media library info: {e}")
             song_info_map = {}
         
         # Global unique song_key counter
         song_key_counter = 10000
+        # Timestamp-based playlist IDs, offset so playlists built in the same
+        # millisecond stay unique
+        base_playlist_id = int(time.time() * 1000)
+        now = base_playlist_id // 1000
         
+        playlist_rows = []
+        song_rows = []
+        created = []
         for playlist in playlists:
             try:
                 playlist_name = playlist.get('name', '')
@@ -199,198 +419,119 @@ class MusicConfigurator(BaseConfigurator):
                 
                 self.log_info(f"Creating playlist: {playlist_name} with {len(songs)} songs")
                 
-                # Create playlist record
-                playlist_id = int(time.time() * 1000)  # Use timestamp as playlist ID
-                
-                # Insert playlist to PlaylistEntity table
-                playlist_insert_sql = f"""
-                INSERT INTO PlaylistEntity (playlist_id, playlist_name)
-                VALUES ({playlist_id}, '{playlist_name}');
-                """
-                adb_utils.execute_sql_command(playlist_db_path, playlist_insert_sql, self.env_controller)
+                playlist_id = base_playlist_id + len(playlist_rows)
+                playlist_rows.append((playlist_id, playlist_name))
                 
                 # Create SongEntity records for each song
                 for i, song_name in enumerate(songs):
                     current_song_key = song_key_counter + i
-                    
-                    # Try to get song info from media library
-                    song_info = song_info_map.get(song_name)
-                    
-                    if song_info:
-                        # Use real song info
-                        song_id = song_info.get('id', i + 1)
-                        track_number = song_info.get('track_number', i + 1)
-                        year = song_info.get('year', 2023)
-                        duration = song_info.get('duration', 180000)
-                        data_path = song_info.get('data', f"/storage/emulated/0/Music/{song_name}.mp3")
-                        date_modified = song_info.get('date_modified', int(time.time()))
-                        album_id = song_info.get('album_id', 1)
-                        album_name = song_info.get('album_name', 'Unknown Album')
-                        artist_id = song_info.get('artist_id', 1)
-                        artist_name = song_info.get('artist_name', 'Unknown Artist')
-                        composer = song_info.get('composer', '')
-                        album_artist = song_info.get('album_artist', '')
-                    else:
-                        # Create default values
-                        song_id = current_song_key
-                        track_number = i + 1
-                        year = 2023
-                        duration = 180000
-                        data_path = f"/storage/emulated/0/Music/{song_name}.mp3"
-                        date_modified = int(time.time())
-                        album_id = song_id
-                        album_name = 'Unknown Album'
-                        artist_id = song_id
-                        artist_name = 'Unknown Artist'
-                        composer = ''
-                        album_artist = ''
-                    
-                    # Create complete SongEntity record
-                    song_insert_sql = f"""
-                    INSERT INTO SongEntity (
-                        playlist_creator_id, song_key, id, title, track_number, year, 
-                        duration, data, date_modified, album_id, album_name, 
-                        artist_id, artist_name, composer, album_artist
-                    ) VALUES (
-                        {playlist_id}, {current_song_key}, {song_id}, '{song_name}', {track_number}, {year}, 
-                        {duration}, '{data_path}', {date_modified}, {album_id}, '{album_name}', 
-                        {artist_id}, '{artist_name}', '{composer}', '{album_artist}'
-                    );
-                    """
-                    adb_utils.execute_sql_command(playlist_db_path, song_insert_sql, self.env_controller)
+                    values = self._song_values(song_name, song_info_map.get(song_name), i, current_song_key, now)
+                    song_rows.append((playlist_id, current_song_key, values[0], song_name) + values[1:])
                 
                 # Update song_key_counter
                 song_key_counter += len(songs) + 1000
-                
-                added_playlists += 1
-                self.log_info(f"Successfully created playlist: {playlist_name} with {len(songs)} songs")
+                created.append((playlist_name, len(songs)))
             except Exception as e:
                 self.log_error(f"Failed to create playlist '{playlist.get('name', 'Unknown')}': {e}")
         
-        self.log_info(f"Successfully created {added_playlists} playlists")
+        if not playlist_rows:
+            self.log_info("Successfully created 0 playlists")
+            return
+        
+        try:
+            sql = ' '.join((
+                'BEGIN;',
+                build_values_insert_sql('PlaylistEntity', ('playlist_id', 'playlist_name'), playlist_rows),
+                build_values_insert_sql('SongEntity', (
+                    'playlist_creator_id', 'song_key', 'id', 'title', 'track_number', 'year',
+                    'duration', 'data', 'date_modified', 'album_id', 'album_name',
+                    'artist_id', 'artist_name', 'composer', 'album_artist',
+                ), song_rows),
+                'COMMIT;',
+            ))
+            self._exec_sqlite(playlist_db_path, sql)
+            self._mutated = True
+        except Exception as e:
+            self.log_error(f"Failed to create playlists: {e}")
+            return
+        
+        for playlist_name, song_count in created:
+            self.log_info(f"Successfully created playlist: {playlist_name} with {song_count} songs")
+        self.log_info(f"Successfully created {len(created)} playlists")
     
     def _set_queue(self, queue_songs: List[str]) -> None:
-        """Set playback queue."""
+        """Set playback queue, replacing the old one in one transaction."""
         playback_db_path = '/data/data/code.name.monkey.retromusic/databases/music_playback_state.db'
         
         try:
             self.log_info(f"Setting playback queue with {len(queue_songs)} songs")
             
-            # Clear existing queue
-            clear_queue_sql = "DELETE FROM playing_queue;"
-            adb_utils.execute_sql_command(playback_db_path, clear_queue_sql, self.env_controller)
-            
-            # Get song info map
-            song_info_map = self._get_song_info_map()
+            # Get song info for the queued songs only
+            song_info_map = self._song_info(queue_songs)
             
-            # Add each song to playback queue
+            now = int(time.time())
+            queue_rows = []
             for i, song_name in enumerate(queue_songs):
-                song_info = song_info_map.get(song_name)
-                
-                if song_info:
-                    # Use real song info
-                    song_id = song_info.get('id', i + 1)
-                    track_number = song_info.get('track_number', i + 1)
-                    year = song_info.get('year', 2023)
-                    duration = song_info.get('duration', 180000)
-                    data_path = song_info.get('data', f"/storage/emulated/0/Music/{song_name}.mp3")
-                    date_modified = song_info.get('date_modified', int(time.time()))
-                    album_id = song_info.get('album_id', 1)
-                    album_name = song_info.get('album_name', 'Unknown Album')
-                    artist_id = song_info.get('artist_id', 1)
-                    artist_name = song_info.get('artist_name', 'Unknown Artist')
-                    composer = song_info.get('composer', '')
-                    album_artist = song_info.get('album_artist', '')
-                else:
-                    # Create default values
-                    song_id = i + 1000
-                    track_number = i + 1
-                    year = 2023
-                    duration = 180000
-                    data_path = f"/storage/emulated/0/Music/{song_name}.mp3"
-                    date_modified = int(time.time())
-                    album_id = song_id
-                    album_name = 'Unknown Album'
-                    artist_id = song_id
-                    artist_name = 'Unknown Artist'
-                    composer = ''
-                    album_artist = ''
-                
-                # Use correct column structure
-                queue_insert_sql = f"""
-                INSERT INTO playing_queue (
-                    _id, title, track, year, duration, 
-                    _data, date_modified, album_id, album, 
-                    artist_id, artist, composer, album_artist
-                ) VALUES (
-                    {song_id}, '{song_name}', {track_number}, {year}, {duration}, 
-                    '{data_path}', {date_modified}, {album_id}, '{album_name}', 
-                    {artist_id}, '{artist_name}', '{composer}', '{album_artist}'
-                );
-                """
-                adb_utils.execute_sql_command(playback_db_path, queue_insert_sql, self.env_controller)
+                values = self._song_values(song_name, song_info_map.get(song_name), i, i + 1000, now)
+                queue_rows.append((values[0], song_name) + values[1:])
+            
+            # Clear existing queue and add each song to it
+            sql = ' '.join((
+                'BEGIN;',
+                'DELETE FROM playing_queue;',
+                build_values_insert_sql('playing_queue', (
+                    '_id', 'title', 'track', 'year', 'duration',
+                    '_data', 'date_modified', 'album_id', 'album',
+                    'artist_id', 'artist', 'composer', 'album_artist',
+                ), queue_rows),
+                'COMMIT;',
+            ))
+            self._exec_sqlite(playback_db_path, sql)
+            self._mutated = True
             
             self.log_info(f"Successfully set playback queue with {len(queue_songs)} songs")
         except Exception as e:
             self.log_error(f"Failed to set playback queue: {e}")
     
-    def _clear_playlist_dbs(self, playlist_db_path: str) -> None:
-        """Clear all playlist-related databases."""
-        try:
-            adb_utils.execute_sql_command(
-                playlist_db_path, 
-                "DELETE FROM PlaylistEntity;", 
-                self.env_controller
-            )
-            self.log_info("Cleared PlaylistEntity table")
+    def _song_info(self, song_names: Iterable[str]) -> dict:
+        """Song info mapping from the media library, querying only titles not looked up yet.
+        
+        Args:
+            song_names: Titles of the songs needed
             
-            adb_utils.execute_sql_command(
-                playlist_db_path, 
-                "DELETE FROM SongEntity;", 
-                self.env_controller
-            )
-            self.log_info("Cleared SongEntity table")
-        except Exception as e:
-            self.log_error(f"Failed to clear playlist database tables: {e}")
+        Returns:
+            Mapping of title to song info, or to None for titles not in the library
+        """
+        missing = [name for name in dict.fromkeys(song_names) if name not in self._song_info_cache]
+        if missing:
+            found = self._get_song_info_map(missing)
+            for name in missing:
+                self._song_info_cache[name] = found.get(name)
+        return self._song_info_cache
     
-    def _get_song_info_map(self) -> dict:
-        """Get song info mapping from media library."""
+    def _get_song_info_map(self, titles: Optional[List[str]] = None) -> dict:
+        """Get song info mapping from media library.
+        
+        Args:
+            titles: Only query songs with these titles; the whole library if None
+        """
         try:
             song_info_map = {}
             
-            # Query media library content provider for song info
-            cmd = [
-                'shell', 
-                'content query --uri content://media/external/audio/media'
-            ]
+            # Query media library content provider for song info, letting the
+            # provider filter by title so large libraries are not dumped
+            query = 'content query --uri content://media/external/audio/media'
+            if titles:
+                query += f' --where {_where_in("title", titles)}'
+            cmd = ['shell', query]
             response = adb_utils.issue_generic_request(cmd, self.env_controller)
-            output = response.generic.output.decode('utf-8', errors='ignore')
             
-            # Parse output
-            current_song = {}
-            current_title = None
+            # Scan the raw output in one regex pass per row; only the
+            # extracted keys and values are decoded
+            for song in _parse_content_rows(response.generic.output):
+                if song.get('title'):
+                    song_info_map[song['title']] = song
             
-            for line in output.splitlines():
-                if line.strip().startswith('Row:'):
-                    # New song record
-                    if current_title and current_song:
-                        song_info_map[current_title] = current_song
-                    current_song = {}
-                    current_title = None
-                elif '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'title':
-                        current_title = value
-                    
-                    current_song[key] = value
-            
-            # Add last song
-            if current_title and current_song:
-                song_info_map[current_title] = current_song
-                
             return song_info_map
         except Exception as e:
             self.log_error(f"Failed to get song info: {e}")
@@ -0,0 +1,44 @@
+"""Tests for parsing `content query` output in the music configurator."""
+
+from absl.testing import absltest
+
+from emulator_init.modules import music_configurator
+
+
+class ParseContentRowsTest(absltest.TestCase):
+    
+    def test_parses_fields_of_each_row(self):
+        output = (
+            b'Row: 0 _id=12, title=Song A, duration=180000\n'
+            b'Row: 1 _id=13, title=Song B, duration=200000\n'
+        )
+        self.assertEqual(
+            music_configurator._parse_content_rows(output),
+            [
+                {'_id': '12', 'title': 'Song A', 'duration': '180000'},
+                {'_id': '13', 'title': 'Song B', 'duration': '200000'},
+            ],
+        )
+    
+    def test_null_becomes_none(self):
+        rows = music_configurator._parse_content_rows(b'Row: 0 _id=1, composer=NULL\n')
+        self.assertEqual(rows, [{'_id': '1', 'composer': None}])
+    
+    def test_value_may_contain_commas_and_equals(self):
+        rows = music_configurator._parse_content_rows(
+            b'Row: 0 title=Hello, World, album=a=b, _id=3\n'
+        )
+        self.assertEqual(rows, [{'title': 'Hello, World', 'album': 'a=b', '_id': '3'}])
+    
+    def test_handles_crlf_and_non_row_lines(self):
+        output = b'No result found.\r\nRow: 0 _id=5, title=X\r\n'
+        self.assertEqual(
+            music_configurator._parse_content_rows(output), [{'_id': '5', 'title': 'X'}]
+        )
+    
+    def test_empty_output(self):
+        self.assertEqual(music_configurator._parse_content_rows(b''), [])
+
+
+if __name__ == '__main__':
+    absltest.main()
@@ -1,19 +1,108 @@
 """OpenTracks configuration for Android emulator."""
 
 import datetime
-import random
+import functools
+import os
+import re
 import uuid
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
+import numpy as np
 import pytz
 from android_world.env import adb_utils
 
-from .base_configurator import BaseConfigurator
+from .base_configurator import WRITE_PRAGMAS, BaseConfigurator
+from ..utils.helpers import build_values_insert_sql, get_installed_packages
+
+
+_DB_PATH = "/data/data/de.dennisguse.opentracks/databases/database.db"
+_TRACKS_TABLE = "tracks"
+_TRACK_COLUMNS = (
+    'name', 'description', 'category', 'activity_type',
+    'starttime', 'stoptime', 'totaldistance',
+    'totaltime', 'movingtime',
+    'avgspeed', 'avgmovingspeed',
+    'elevationgain', 'elevationloss',
+    'uuid', 'starttime_offset', 'icon',
+)
+
+# Accepted activity start dates: ISO dates are matched directly, the other
+# formats go through strptime
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+_OTHER_DATE_FORMATS = ("%B %d %Y", "%m/%d/%Y")
+_HHMM_RE = re.compile(r'^(\d{1,2}):(\d{1,2})$')
+
+
+def _parse_date(date_str: str) -> datetime.date:
+    """Parse an activity start date in one of the accepted formats."""
+    match = _ISO_DATE_RE.match(date_str)
+    if match:
+        try:
+            return datetime.date(*map(int, match.groups()))
+        except ValueError:
+            pass
+    for fmt in _OTHER_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Cannot parse date format: {date_str}")
+
+
+def _parse_hhmm(time_str: str) -> Tuple[int, int]:
+    """Parse an HH:MM start time into (hour, minute)."""
+    match = _HHMM_RE.match(time_str)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if hour < 24 and minute < 60:
+            return hour, minute
+    raise ValueError(f"Cannot parse time format: {time_str}")
+
+# Random activity names per category, and distance ranges in meters
+_RANDOM_ACTIVITY_NAMES = {
+    "Running": ["Morning Run", "Night Run", "Marathon Training", "Interval Run", "Long-distance Run"],
+    "Cycling": ["Bike Commute", "Mountain Biking", "Road Cycling", "Leisure Cycling"],
+    "Walking": ["Stroll", "Brisk Walking", "Hiking", "City Walk"],
+    "Swimming": ["Freestyle", "Breaststroke", "Backstroke", "Butterfly", "Medley"],
+    "Skiing": ["Alpine Skiing", "Cross-country Skiing", "Freestyle Skiing"],
+    "Fitness": ["Strength Training", "HIIT Workout", "Cardio", "Yoga"],
+    "Ball Sports": ["Basketball", "Soccer", "Tennis", "Volleyball"]
+}
+_DISTANCE_RANGES = {
+    "Running": (1000, 15000),   # 1-15km
+    "Cycling": (5000, 50000),   # 5-50km
+    "Walking": (500, 8000),     # 0.5-8km
+    "Swimming": (100, 3000),    # 100-3000m
+}
+_DEFAULT_DISTANCE_RANGE = (1000, 10000)  # 1-10km
+
+# Strings derived from the fixed categories and names, built once
+_ICON_BY_CATEGORY = {category: f'activity_{category}' for category in _RANDOM_ACTIVITY_NAMES}
+_RANDOM_DESCRIPTION_BY_NAME = {
+    name: f"Random {name} activity" for names in _RANDOM_ACTIVITY_NAMES.values() for name in names
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_tz(name: str) -> datetime.tzinfo:
+    """Load a pytz timezone once per name."""
+    return pytz.timezone(name)
 
 
 class OpenTracksConfigurator(BaseConfigurator):
     """Configurator for OpenTracks activity tracker app."""
     
+    # Device timezone name, read from the device at most once.
+    __slots__ = ('_device_timezone_str',)
+    
+    parallel_safe = True
+    
+    _DEVICE_PATHS = ('/data/data/de.dennisguse.opentracks',)
+    
+    def __init__(self, env, config: Dict[str, Any]):
+        super().__init__(env, config)
+        self._device_timezone_str = None
+    
     @property
     def module_name(self) -> str:
         return "OpenTracks"
@@ -50,7 +139,13 @@ class OpenTracksConfigurator(BaseConfigurator):
             return False
     
     def _get_device_timezone(self) -> str:
-        """Get the current timezone from the device."""
+        """Get the current timezone from the device, asking it only once."""
+        if self._device_timezone_str is None:
+            self._device_timezone_str = self._read_device_timezone()
+        return self._device_timezone_str
+    
+    def _read_device_timezone(self) -> str:
+        """Read the current timezone from the device."""
         try:
             response = adb_utils.issue_generic_request(
                 ['shell', 'getprop', 'persist.sys.timezone'],
@@ -70,8 +165,7 @@ class OpenTracksConfigurator(BaseConfigurator):
         
         try:
             # Check if app is installed
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if package_name not in all_packages:
+            if package_name not in get_installed_packages(self.env_controller):
                 self.log_warning(f"OpenTracks app is not installed (package: {package_name}), skipping configuration")
                 return False
             
@@ -82,37 +176,54 @@ class OpenTracksConfigurator(BaseConfigurator):
     
     def _clear_activities(self) -> None:
         """Clear existing activity records."""
-        db_path = "/data/data/de.dennisguse.opentracks/databases/database.db"
-        tracks_table = "tracks"
-        
         try:
             self.log_info("Clearing existing OpenTracks activity records...")
             adb_utils.execute_sql_command(
-                db_path, 
-                f"DELETE FROM {tracks_table};", 
+                _DB_PATH, 
+                f"DELETE FROM {_TRACKS_TABLE};", 
                 self.env_controller
             )
             self.log_info("Successfully cleared OpenTracks activity records")
         except Exception as e:
             self.log_error(f"Failed to clear OpenTracks activity records: {e}")
     
+    def _insert_tracks(self, rows: List[tuple]) -> bool:
+        """Insert track rows in one transaction with a single sqlite3 call.
+        
+        Args:
+            rows: Value tuples in _TRACK_COLUMNS order
+            
+        Returns:
+            True if the rows were inserted
+        """
+        if not rows:
+            return True
+        try:
+            sql = build_values_insert_sql(_TRACKS_TABLE, _TRACK_COLUMNS, rows)
+            self._exec_sqlite(_DB_PATH, f"{WRITE_PRAGMAS} BEGIN; {sql} COMMIT;")
+            return True
+        except Exception as e:
+            self.log_error(f"Failed to insert {len(rows)} activity records: {e}")
+            return False
+    
     def _add_activities(self, activities: List[Dict[str, Any]]) -> None:
         """Add custom activity records."""
-        db_path = "/data/data/de.dennisguse.opentracks/databases/database.db"
-        tracks_table = "tracks"
         device_timezone_str = self._get_device_timezone()
-        device_tz = pytz.timezone(device_timezone_str)
+        device_tz = _load_tz(device_timezone_str)
 
         self.log_info(f"Preparing to add {len(activities)} activity records using timezone: {device_timezone_str}...")
         
+        rows = []
+        added_names = []
         for activity in activities:
             try:
                 # Required fields
                 name = activity.get('name', '')
                 category = activity.get('category', 'running')  # Default to 'running' if not provided
-                description = activity.get('description', f'{name} activity')  # Provide a default description
+                # Provide a default description, only formatted when needed
+                description = activity['description'] if 'description' in activity else f'{name} activity'
                 activity_type = category  # Keep activity_type same as category, as per original logic for now
-                icon = f'activity_{category}'  # Set a default icon based on category
+                icon = _ICON_BY_CATEGORY.get(category) or f'activity_{category}'  # Set a default icon based on category
 
                 # Time related
                 start_date_str = activity.get('start_date', '')
@@ -122,38 +233,23 @@ class OpenTracksConfigurator(BaseConfigurator):
                 # Parse date and time
                 if start_date_str:
                     try:
-                        date_formats = ["%Y-%m-%d", "%B %d %Y", "%m/%d/%Y"]
-                        parsed_date = None
-                        
-                        for fmt in date_formats:
-                            try:
-                                parsed_date = datetime.datetime.strptime(start_date_str, fmt)
-                                break
-                            except ValueError:
-                                continue
-                        
-                        if parsed_date is None:
-                            raise ValueError(f"Cannot parse date format: {start_date_str}")
-                            
-                        start_date_str = parsed_date.strftime("%Y-%m-%d")
-                    except Exception as e:
+                        start_date = _parse_date(start_date_str)
+                    except ValueError as e:
                         self.log_error(f"Date format conversion failed: {e}")
                         continue
                 else:
                     # Use current date if not specified
-                    start_date_str = datetime.datetime.now(device_tz).strftime("%Y-%m-%d")
+                    start_date = datetime.datetime.now(device_tz).date()
                 
                 # Parse time
                 try:
-                    parsed_time = datetime.datetime.strptime(start_time_str, "%H:%M")
-                    start_time_str = parsed_time.strftime("%H:%M")
-                except ValueError:
-                    self.log_error(f"Cannot parse time format: {start_time_str}")
-                    start_time_str = "00:00"
+                    hour, minute = _parse_hhmm(start_time_str)
+                except ValueError as e:
+                    self.log_error(str(e))
+                    hour, minute = 0, 0
                 
                 # Convert to unix timestamp (milliseconds)
-                dt_str = f"{start_date_str} {start_time_str}"
-                naive_dt = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
+                naive_dt = datetime.datetime(start_date.year, start_date.month, start_date.day, hour, minute)
                 
                 # Make datetime object timezone-aware
                 aware_dt = device_tz.localize(naive_dt)
@@ -182,134 +278,85 @@ class OpenTracksConfigurator(BaseConfigurator):
                 # Generate UUID
                 uuid_str = str(uuid.uuid4())
                 
-                # Build SQL insert command
-                sql_command = f"""
-                INSERT INTO {tracks_table} (
-                    name, description, category, activity_type, 
-                    starttime, stoptime, totaldistance, 
-                    totaltime, movingtime, 
-                    avgspeed, avgmovingspeed, 
-                    elevationgain, elevationloss,
-                    uuid, starttime_offset, icon
-                ) VALUES (
-                    '{name}', '{description}', '{category}', '{activity_type}',
-                    {starttime}, {stoptime}, {total_distance},
-                    {totaltime}, {movingtime},
-                    {avg_speed}, {avg_speed},
-                    {elevation_gain}, {elevation_loss},
-                    '{uuid_str}', {starttime_offset}, '{icon}'
-                );
-                """
-                
-                # Execute SQL command
-                adb_utils.execute_sql_command(
-                    db_path, 
-                    sql_command, 
-                    self.env_controller
-                )
-                
-                self.log_info(f"Successfully added activity record: {name} ({category})")
+                rows.append((
+                    name, description, category, activity_type,
+                    starttime, stoptime, total_distance,
+                    totaltime, movingtime,
+                    avg_speed, avg_speed,
+                    elevation_gain, elevation_loss,
+                    uuid_str, starttime_offset, icon,
+                ))
+                added_names.append(f"{name} ({category})")
             except Exception as e:
                 self.log_error(f"Failed to add activity record: {e}")
         
+        # All records go in with one round-trip and one commit
+        if self._insert_tracks(rows):
+            for added_name in added_names:
+                self.log_info(f"Successfully added activity record: {added_name}")
+        
         self.log_info("Completed adding OpenTracks activity records")
     
     def _add_random_activities(self, random_count: int) -> None:
         """Add random activity records."""
-        db_path = "/data/data/de.dennisguse.opentracks/databases/database.db"
-        tracks_table = "tracks"
         device_timezone_str = self._get_device_timezone()
-        device_tz = pytz.timezone(device_timezone_str)
+        device_tz = _load_tz(device_timezone_str)
 
         self.log_info(f"Preparing to add {random_count} random activity records using timezone: {device_timezone_str}...")
         
-        # Activity type and name mapping
-        category_to_names = {
-            "Running": ["Morning Run", "Night Run", "Marathon Training", "Interval Run", "Long-distance Run"],
-            "Cycling": ["Bike Commute", "Mountain Biking", "Road Cycling", "Leisure Cycling"],
-            "Walking": ["Stroll", "Brisk Walking", "Hiking", "City Walk"],
-            "Swimming": ["Freestyle", "Breaststroke", "Backstroke", "Butterfly", "Medley"],
-            "Skiing": ["Alpine Skiing", "Cross-country Skiing", "Freestyle Skiing"],
-            "Fitness": ["Strength Training", "HIIT Workout", "Cardio", "Yoga"],
-            "Ball Sports": ["Basketball", "Soccer", "Tennis", "Volleyball"]
-        }
+        categories = list(_RANDOM_ACTIVITY_NAMES)
+        low, high = np.array([_DISTANCE_RANGES.get(category, _DEFAULT_DISTANCE_RANGE) for category in categories]).T
+        
+        # Draw every random field for all records at once
+        rng = np.random.default_rng()
+        category_idx = rng.integers(0, len(categories), random_count)
+        name_picks = rng.random(random_count)
+        # Start within the past 30 days, in minutes
+        minutes_ago = (
+            rng.integers(0, 31, random_count) * 24 * 60
+            + rng.integers(0, 24, random_count) * 60
+            + rng.integers(0, 60, random_count)
+        )
+        duration_mins = rng.integers(15, 181, random_count)  # 15 minutes to 3 hours
+        distances = rng.uniform(low[category_idx], high[category_idx])
+        elevation_gains = rng.uniform(0, 500, random_count)
+        elevation_losses = rng.uniform(0, 500, random_count)
+        
+        now = datetime.datetime.now(device_tz)
+        starttimes = int(now.timestamp() * 1000) - minutes_ago * 60 * 1000
+        totaltimes = duration_mins * 60 * 1000
+        avg_speeds = distances / (totaltimes / 1000)
+        
+        # Entropy for all UUIDs in one read
+        uuid_bytes = os.urandom(16 * random_count)
         
+        rows = []
+        added_names = []
         for i in range(random_count):
-            try:
-                # Randomly select activity type and name
-                category = random.choice(list(category_to_names.keys()))
-                name = random.choice(category_to_names[category])
-                description = f"Random {name} activity"  # Default description for random activities
-                activity_type = category
-                icon = f'activity_{category}'
-
-                # Generate random time (past 30 days)
-                days_ago = random.randint(0, 30)
-                hours_ago = random.randint(0, 23)
-                minutes_ago = random.randint(0, 59)
-                
-                now = datetime.datetime.now(device_tz)
-                random_dt = now - datetime.timedelta(days=days_ago, hours=hours_ago, minutes=minutes_ago)
-
-                starttime = int(random_dt.timestamp() * 1000)
-                starttime_offset = int(random_dt.utcoffset().total_seconds())
-
-                # Random duration (15 minutes to 3 hours)
-                duration_mins = random.randint(15, 180)
-                stoptime = starttime + (duration_mins * 60 * 1000)
-                totaltime = stoptime - starttime
-                movingtime = totaltime
-                
-                # Random distance (based on different activity types)
-                if category == "Running":
-                    distance = random.uniform(1000, 15000)  # 1-15km
-                elif category == "Cycling":
-                    distance = random.uniform(5000, 50000)  # 5-50km
-                elif category == "Walking":
-                    distance = random.uniform(500, 8000)    # 0.5-8km
-                elif category == "Swimming":
-                    distance = random.uniform(100, 3000)    # 100-3000m
-                else:
-                    distance = random.uniform(1000, 10000)  # 1-10km
-                
-                # Calculate average speed
-                avg_speed = distance / (totaltime / 1000) if totaltime > 0 else 0
-                
-                # Random elevation change
-                elevation_gain = random.uniform(0, 500)
-                elevation_loss = random.uniform(0, 500)
-                
-                # Generate UUID string
-                uuid_str = str(uuid.uuid4())
-                
-                # Build SQL insert command
-                sql_command = f"""
-                INSERT INTO {tracks_table} (
-                    name, description, category, activity_type, 
-                    starttime, stoptime, totaldistance, 
-                    totaltime, movingtime, 
-                    avgspeed, avgmovingspeed, 
-                    elevationgain, elevationloss,
-                    uuid, starttime_offset, icon
-                ) VALUES (
-                    '{name}', '{description}', '{category}', '{activity_type}',
-                    {starttime}, {stoptime}, {distance},
-                    {totaltime}, {movingtime},
-                    {avg_speed}, {avg_speed},
-                    {elevation_gain}, {elevation_loss},
-                    '{uuid_str}', {starttime_offset}, '{icon}'
-                );
-                """
-                
-                # Execute SQL command
-                adb_utils.execute_sql_command(
-                    db_path, 
-                    sql_command, 
-                    self.env_controller
-                )
-                
-                self.log_info(f"Successfully added random activity record #{i+1}: {name} ({category})")
-            except Exception as e:
-                self.log_error(f"Failed to add random activity record: {e}")
+            category = categories[category_idx[i]]
+            names = _RANDOM_ACTIVITY_NAMES[category]
+            name = names[int(name_picks[i] * len(names))]
+            starttime = int(starttimes[i])
+            # Per record, since the past 30 days may span a DST change
+            starttime_offset = int(
+                datetime.datetime.fromtimestamp(starttime / 1000, device_tz).utcoffset().total_seconds()
+            )
+            totaltime = int(totaltimes[i])
+            avg_speed = float(avg_speeds[i])
+            rows.append((
+                name, _RANDOM_DESCRIPTION_BY_NAME[name], category, category,
+                starttime, starttime + totaltime, float(distances[i]),
+                totaltime, totaltime,
+                avg_speed, avg_speed,
+                float(elevation_gains[i]), float(elevation_losses[i]),
+                str(uuid.UUID(bytes=uuid_bytes[16 * i:16 * (i + 1)], version=4)),
+                starttime_offset, _ICON_BY_CATEGORY[category],
+            ))
+            added_names.append(f"#{i+1}: {name} ({category})")
+        
+        # All records go in with one round-trip and one commit
+        if self._insert_tracks(rows):
+            for added_name in added_names:
+                self.log_info(f"Successfully added random activity record {added_name}")
         
         self.log_info("Completed adding OpenTracks random activity records")
@@ -1,19 +1,32 @@
 """OsmAnd configuration for Android emulator."""
 
 import os
-import time
-from typing import Dict, Any, List
+import shlex
+import tempfile
+from typing import Dict, Any, List, Tuple
 from xml.etree import ElementTree
 
 from android_world.env import adb_utils
 from android_world.utils import file_utils
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import get_installed_packages
+
+
+_GPX_NAMESPACE = 'http://www.topografix.com/GPX/1/1'
+
+# Serialize GPX elements with a default namespace instead of ns0: prefixes
+ElementTree.register_namespace('', _GPX_NAMESPACE)
 
 
 class OsmAndConfigurator(BaseConfigurator):
     """Configurator for OsmAnd map app."""
     
+    __slots__ = ()
+    
+    # /data/media/0 is where /storage/emulated/0 lives
+    _DEVICE_PATHS = ('/storage/emulated/0/Android/data/net.osmand', '/data/data/net.osmand')
+    
     # Constants from osmand.py
     _DEVICE_FILES = '/data/media/0/Android/data/net.osmand/files'
     _LEGACY_FILES = '/data/data/net.osmand/files'
@@ -21,7 +34,14 @@ class OsmAndConfigurator(BaseConfigurator):
     _LEGACY_FAVORITES_PATH = os.path.join(_LEGACY_FILES, 'favourites_bak.gpx')
     _BACKUP_DIR_PATH = os.path.join(_LEGACY_FILES, 'backup')
     
-    _FAVORITES_XML_NAMESPACES = {'gpx': 'http://www.topografix.com/GPX/1/1'}
+    # Favorites file without any waypoints
+    _EMPTY_GPX = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        f'<gpx version="1.1" creator="OsmAnd" xmlns="{_GPX_NAMESPACE}" />\n'
+    )
+    
+    # Printed for each favorites file that was emptied, followed by its path
+    _CLEARED_MARKER = 'CLEARED: '
     
     # Predefined locations (Liechtenstein locations from osmand.py)
     _PRELOADED_MAP_LOCATIONS = {
@@ -78,8 +98,7 @@ class OsmAndConfigurator(BaseConfigurator):
         
         try:
             # Check if app is installed
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if package_name not in all_packages:
+            if package_name not in get_installed_packages(self.env_controller):
                 self.log_warning("OsmAnd app is not installed! Skipping configuration.")
                 return False
             
@@ -92,9 +111,10 @@ class OsmAndConfigurator(BaseConfigurator):
         """Initialize OsmAnd app to create necessary directories and files."""
         self.log_info("Initializing OsmAnd app...")
         adb_utils.launch_app("OsmAnd", self.env_controller)
-        time.sleep(3)  # Wait for app to initialize
-        adb_utils.close_app("OsmAnd", self.env_controller)
-        time.sleep(1)
+        # Wait for app to initialize, i.e. until it has created its files directory
+        if not self._wait_until(lambda: self._path_exists(self._DEVICE_FILES), timeout_s=5.0, interval_s=0.2):
+            self.log_warning("OsmAnd files directory not created after 5s, continuing")
+        adb_utils.close_app("OsmAnd", self.env_controller)  # force-stop is synchronous
     
     def _clear_favorites(self) -> None:
         """Clear existing favorite locations using the same method as osmand.py."""
@@ -103,16 +123,24 @@ class OsmAndConfigurator(BaseConfigurator):
         try:
             # Clear backup directory
             file_utils.clear_directory(self._BACKUP_DIR_PATH, self.env_controller)
+            self.invalidate_paths([self._BACKUP_DIR_PATH])
             
-            # Clear favorites files
-            for path in [self._FAVORITES_PATH, self._LEGACY_FAVORITES_PATH]:
-                if file_utils.check_file_exists(path, self.env_controller):
-                    with file_utils.tmp_file_from_device(path, self.env_controller) as favorites_file:
-                        tree = ElementTree.parse(favorites_file)
-                        for waypoint in tree.findall('gpx:wpt', self._FAVORITES_XML_NAMESPACES):
-                            tree.getroot().remove(waypoint)
-                        tree.write(favorites_file)
-                        file_utils.copy_data_to_device(favorites_file, path, self.env_controller)
+            # Clear favorites files by overwriting the existing ones with an
+            # empty GPX document in place, without pulling and parsing them
+            paths = [self._FAVORITES_PATH, self._LEGACY_FAVORITES_PATH]
+            empty_gpx = shlex.quote(self._EMPTY_GPX)
+            output = self.run_shell_batch([
+                f'if [ -e {shlex.quote(path)} ]; then printf %s {empty_gpx} > {shlex.quote(path)} && '
+                f'echo {shlex.quote(self._CLEARED_MARKER + path)}; fi'
+                for path in paths
+            ], separator='; ')
+            cleared = {
+                line[len(self._CLEARED_MARKER):] for line in output.splitlines()
+                if line.startswith(self._CLEARED_MARKER)
+            }
+            for path in paths:
+                if path in cleared:
+                    self._remember_path(path)
                     self.log_info(f"Cleared favorites from {path}")
                 else:
                     self.log_info(f"Favorites file {path} not found, creating new one")
@@ -122,9 +150,10 @@ class OsmAndConfigurator(BaseConfigurator):
             self.log_error(f"Failed to clear OsmAnd favorite locations: {e}")
     
     def _add_favorites(self, favorites: List[Dict[str, Any]]) -> None:
-        """Add favorite locations using GPX XML format."""
+        """Add favorite locations using GPX XML format, with one pull and one push."""
         self.log_info(f"Adding {len(favorites)} favorite locations to OsmAnd...")
         
+        waypoints = []
         for favorite in favorites:
             name = favorite.get('name', 'Unnamed Location')
             
@@ -140,85 +169,87 @@ class OsmAndConfigurator(BaseConfigurator):
                     self.log_error(f"Failed to add favorite location '{name}': missing coordinates")
                     continue
             
-            try:
-                self._add_single_favorite(name, lat, lon)
-                self.log_info(f"Successfully added favorite location: {name} ({lat}, {lon})")
-            except Exception as e:
-                self.log_error(f"Failed to add favorite location '{name}': {e}")
-    
-    def _add_single_favorite(self, name: str, lat: float, lon: float) -> None:
-        """Add a single favorite location to the GPX file."""
-        # Try to add to the main favorites path first
+            waypoints.append((name, lat, lon))
+        
+        if not waypoints:
+            return
+        
         favorites_path = self._FAVORITES_PATH
+        try:
+            # Ensure the favorites directory exists
+            self._ensure_directory_exists(os.path.dirname(favorites_path))
+            
+            if self._path_exists(favorites_path):
+                with file_utils.tmp_file_from_device(favorites_path, self.env_controller) as favorites_file:
+                    try:
+                        tree = ElementTree.parse(favorites_file)
+                    except ElementTree.ParseError:
+                        # Create new GPX structure if file is corrupted
+                        tree = ElementTree.ElementTree(self._create_gpx_root())
+                    self._write_favorites(tree, waypoints, favorites_file, favorites_path)
+            else:
+                self.log_info(f"Creating new favorites file: {favorites_path}")
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    tree = ElementTree.ElementTree(self._create_gpx_root())
+                    self._write_favorites(tree, waypoints, os.path.join(temp_dir, 'favorites.gpx'), favorites_path)
+                self._remember_path(favorites_path)
+        except Exception as e:
+            self.log_error(f"Failed to add favorite locations: {e}")
+            return
         
-        # Ensure the favorites directory exists
-        favorites_dir = os.path.dirname(favorites_path)
-        self._ensure_directory_exists(favorites_dir)
+        for name, lat, lon in waypoints:
+            self.log_info(f"Successfully added favorite location: {name} ({lat}, {lon})")
+    
+    def _write_favorites(self, tree: ElementTree.ElementTree, waypoints: List[Tuple[str, float, float]],
+                         local_path: str, device_path: str) -> None:
+        """Add waypoints to a GPX tree, write it locally and push it to the device.
         
-        # Check if favorites file exists, if not create it
-        if not file_utils.check_file_exists(favorites_path, self.env_controller):
-            self._create_empty_favorites_file(favorites_path)
+        Args:
+            tree: Parsed favorites file
+            waypoints: (name, lat, lon) of each favorite to add
+            local_path: Local file the tree is written to
+            device_path: Favorites file on the device
+        """
+        root = tree.getroot()
+        for name, lat, lon in waypoints:
+            self._add_waypoint(root, name, lat, lon)
+        tree.write(local_path, encoding='utf-8', xml_declaration=True)
+        file_utils.copy_data_to_device(local_path, device_path, self.env_controller)
+    
+    @staticmethod
+    def _add_waypoint(root: ElementTree.Element, name: str, lat: float, lon: float) -> None:
+        """Append a favorite location to a GPX root element."""
+        # Create waypoint element
+        waypoint = ElementTree.SubElement(root, f'{{{_GPX_NAMESPACE}}}wpt', {
+            'lat': str(lat),
+            'lon': str(lon)
+        })
         
-        # Add the waypoint to the GPX file
-        with file_utils.tmp_file_from_device(favorites_path, self.env_controller) as favorites_file:
-            try:
-                tree = ElementTree.parse(favorites_file)
-                root = tree.getroot()
-            except ElementTree.ParseError:
-                # Create new GPX structure if file is corrupted
-                root = self._create_gpx_root()
-                tree = ElementTree.ElementTree(root)
-            
-            # Create waypoint element
-            waypoint = ElementTree.SubElement(root, 'wpt', {
-                'lat': str(lat),
-                'lon': str(lon)
-            })
-            
-            # Add name element
-            name_elem = ElementTree.SubElement(waypoint, 'name')
-            name_elem.text = name
-            
-            # Add description element (optional)
-            desc_elem = ElementTree.SubElement(waypoint, 'desc')
-            desc_elem.text = f'Favorite location: {name}'
-            
-            # Write back to file
-            tree.write(favorites_file, encoding='utf-8', xml_declaration=True)
-            file_utils.copy_data_to_device(favorites_file, favorites_path, self.env_controller)
+        # Add name element
+        name_elem = ElementTree.SubElement(waypoint, f'{{{_GPX_NAMESPACE}}}name')
+        name_elem.text = name
+        
+        # Add description element (optional)
+        desc_elem = ElementTree.SubElement(waypoint, f'{{{_GPX_NAMESPACE}}}desc')
+        desc_elem.text = f'Favorite location: {name}'
     
     def _ensure_directory_exists(self, directory_path: str) -> None:
         """Ensure a directory exists on the device."""
+        if self._is_known_path(directory_path):
+            return
         try:
             adb_utils.issue_generic_request(
                 ['shell', 'mkdir', '-p', directory_path], 
                 self.env_controller
             )
+            self._remember_path(directory_path)
         except Exception as e:
             self.log_error(f"Failed to create directory {directory_path}: {e}")
     
-    def _create_empty_favorites_file(self, file_path: str) -> None:
-        """Create an empty GPX favorites file."""
-        self.log_info(f"Creating new favorites file: {file_path}")
-        
-        # Create GPX content
-        root = self._create_gpx_root()
-        tree = ElementTree.ElementTree(root)
-        
-        # Write to temporary file and copy to device
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.gpx', delete=False) as temp_file:
-            tree.write(temp_file.name, encoding='utf-8', xml_declaration=True)
-            file_utils.copy_data_to_device(temp_file.name, file_path, self.env_controller)
-        
-        # Clean up temporary file
-        os.unlink(temp_file.name)
-    
     def _create_gpx_root(self) -> ElementTree.Element:
         """Create a GPX root element with proper namespace."""
-        root = ElementTree.Element('gpx', {
+        root = ElementTree.Element(f'{{{_GPX_NAMESPACE}}}gpx', {
             'version': '1.1',
             'creator': 'OsmAnd',
-            'xmlns': 'http://www.topografix.com/GPX/1/1'
         })
         return root 
\ No newline at end of file
@@ -8,11 +8,14 @@ from android_world.env import adb_utils
 from android_world.task_evals.utils import sqlite_schema_utils
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import get_installed_packages
 
 
 class RecipeConfigurator(BaseConfigurator):
     """Configurator for recipe app (Broccoli) data."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "Recipe"
@@ -53,8 +56,7 @@ class RecipeConfigurator(BaseConfigurator):
     def _setup_recipe_app(self) -> bool:
         """Ensure recipe app is installed and properly configured."""
         try:
-            all_packages = adb_utils.get_all_package_names(self.env_controller)
-            if 'com.flauschcode.broccoli' not in all_packages:
+            if 'com.flauschcode.broccoli' not in get_installed_packages(self.env_controller):
                 self.log_error("Broccoli Recipe app is not installed! Please install it first.")
                 return False
             
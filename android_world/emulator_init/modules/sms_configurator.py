@@ -1,10 +1,11 @@
 """SMS configuration for Android emulator."""
 
 import random
+import re
 import time
 from typing import Dict, Any, List
 
-from android_world.env import adb_utils
+from android_world.env import adb_utils, tools
 from android_world.task_evals.utils import user_data_generation
 
 from .base_configurator import BaseConfigurator
@@ -13,6 +14,8 @@ from .base_configurator import BaseConfigurator
 class SMSConfigurator(BaseConfigurator):
     """Configurator for SMS messages."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "SMS"
@@ -79,35 +82,38 @@ class SMSConfigurator(BaseConfigurator):
             # Path to the SMS database
             db_path = "/data/data/com.android.providers.telephony/databases/mmssms.db"
             
-            # Delete messages from SMS, MMS, and threads tables
-            adb_utils.execute_sql_command(db_path, "DELETE FROM sms;", self.env_controller)
-            adb_utils.execute_sql_command(db_path, "DELETE FROM threads;", self.env_controller)
-            adb_utils.execute_sql_command(db_path, "DELETE FROM mms;", self.env_controller)
-            adb_utils.execute_sql_command(db_path, "DELETE FROM canonical_addresses;", self.env_controller)
+            # Ensure root permissions for the telephony provider's database
+            adb_utils.set_root_if_needed(self.env_controller)
             
-            # Also try to clear using content provider
-            clear_commands = [
-                ['shell', 'content delete --uri content://sms'],
-                ['shell', 'content delete --uri content://sms/inbox'],
-                ['shell', 'content delete --uri content://sms/sent'],
-                ['shell', 'content delete --uri content://sms/draft'],
-                ['shell', 'content delete --uri content://sms/conversations'],
-                ['shell', 'content delete --uri content://mms'],
-                ['shell', 'content delete --uri content://mms-sms/conversations'],
-            ]
+            # Delete messages from SMS, MMS, and threads tables in one transaction
+            self._exec_sqlite(
+                db_path,
+                "BEGIN; DELETE FROM sms; DELETE FROM threads; DELETE FROM mms; "
+                "DELETE FROM canonical_addresses; COMMIT;"
+            )
             
-            for cmd in clear_commands:
-                try:
-                    adb_utils.issue_generic_request(cmd, self.env_controller)
-                except Exception as e:
-                    self.log_warning(f"Command {cmd} failed: {e}")
+            # Also try to clear using content provider, then force the
+            # messaging app to refresh, all in one shell call
+            clear_uris = [
+                'content://sms',
+                'content://sms/inbox',
+                'content://sms/sent',
+                'content://sms/draft',
+                'content://sms/conversations',
+                'content://mms',
+                'content://mms-sms/conversations',
+            ]
+            output = self.run_shell_batch(
+                [f'content delete --uri {uri} || echo FAILED: {uri}' for uri in clear_uris]
+                + ['am broadcast -a android.provider.Telephony.SMS_RECEIVED'],
+                separator='; ',
+            )
+            for line in output.splitlines():
+                if line.startswith('FAILED: '):
+                    self.log_warning(f"Content delete failed for {line[len('FAILED: '):]}")
             
             self.log_info('Successfully cleared SMS and threads tables.')
             
-            # Force messaging app to refresh
-            refresh_cmd = ['shell', 'am broadcast -a android.provider.Telephony.SMS_RECEIVED']
-            adb_utils.issue_generic_request(refresh_cmd, self.env_controller)
-            
         except Exception as e:
             self.log_error(f"Error clearing SMS database: {e}")
             self.log_info('Falling back to app data clearing method...')
@@ -155,10 +161,6 @@ class SMSConfigurator(BaseConfigurator):
         direction = "received from" if is_received else "sent to"  # Define direction first
         
         try:
-            import re
-            import time
-            from android_world.env import adb_utils
-            
             # Clean the phone number
             clean_number = re.sub(r'[^0-9+]', '', number)
             timestamp = int(time.time() * 1000)  # Current time in milliseconds
@@ -192,7 +194,6 @@ class SMSConfigurator(BaseConfigurator):
                         adb_utils.text_emulator(self.env_controller, number, text)
                     else:
                         # For outgoing messages, use UI interaction
-                        from android_world.env import tools
                         controller = tools.AndroidToolController(self.env_controller)
                         controller.send_sms(number, text)
             else:
@@ -202,7 +203,6 @@ class SMSConfigurator(BaseConfigurator):
                     adb_utils.text_emulator(self.env_controller, number, text)
                 else:
                     # For outgoing messages, use UI interaction
-                    from android_world.env import tools
                     controller = tools.AndroidToolController(self.env_controller)
                     controller.send_sms(number, text)
                     
@@ -8,6 +8,8 @@ from .base_configurator import BaseConfigurator
 class SystemConfigurator(BaseConfigurator):
     """Configurator for system settings."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "System"
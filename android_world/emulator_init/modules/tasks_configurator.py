@@ -10,11 +10,14 @@ from android_world.env import adb_utils
 from android_world.task_evals.utils import sqlite_schema_utils
 
 from .base_configurator import BaseConfigurator
+from ..utils.helpers import get_installed_packages
 
 
 class TasksConfigurator(BaseConfigurator):
     """Configurator for Tasks app task management."""
     
+    __slots__ = ()
+    
     @property
     def module_name(self) -> str:
         return "Tasks"
@@ -57,8 +60,7 @@ class TasksConfigurator(BaseConfigurator):
     def _setup_tasks_app(self) -> bool:
         """Ensure tasks app is installed and properly configured."""
         try:
-            packages = adb_utils.get_all_package_names(self.env_controller)
-            if 'org.tasks' not in packages:
+            if 'org.tasks' not in get_installed_packages(self.env_controller):
                 self.log_error('Tasks app is not installed; cannot configure tasks')
                 return False
             
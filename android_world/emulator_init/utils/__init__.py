@@ -6,8 +6,10 @@ from .helpers import *
 __all__ = [
     'DB_PATHS', 'TABLE_NAMES', 'PACKAGE_NAMES', 'APP_NAMES', 'FILE_PATHS',
     'OSMAND_PATHS', 'DEFAULTS', 'PREDEFINED_LOCATIONS', 'FONT_PATHS',
-    'get_default_adb_path', 'ensure_app_ready', 'check_database_exists',
+    'get_default_adb_path', 'get_installed_packages', 'invalidate_package_cache',
+    'ensure_app_ready', 'check_database_exists',
     'clear_database_table', 'verify_table_count', 'safe_sql_insert',
+    'build_values_insert_sql', 'build_insert_sql', 'build_batch_insert_sql',
     'parse_datetime_string', 'get_font_path', 'create_text_image',
     'ensure_directory_exists', 'trigger_media_scan', 'cleanup_temp_file'
 ] 
\ No newline at end of file
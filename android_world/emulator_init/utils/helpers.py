@@ -1,11 +1,17 @@
 """Common helper functions for emulator initialization."""
 
+import dataclasses
 import datetime
+import functools
 import logging
+import math
 import os
 import platform
+import shlex
+import threading
 import time
-from typing import Any, Dict, List, Optional
+import weakref
+from typing import Any, Dict, List, Optional, Sequence
 
 from android_world.env import adb_utils
 from android_world.task_evals.utils import sqlite_schema_utils
@@ -45,6 +51,57 @@ def get_all_package_names(env_controller) -> list[str]:
 adb_utils.get_all_package_names = get_all_package_names
 
 
+# Recent package listings per env controller: (monotonic timestamp, packages).
+_PACKAGE_CACHE_TTL_SEC = 30.0
+_package_cache = weakref.WeakKeyDictionary()
+_package_cache_lock = threading.Lock()
+
+
+def get_installed_packages(env_controller) -> frozenset[str]:
+    """Get installed package names, reusing a recent listing for the device.
+    
+    Every configurator checks that its app is installed; caching the listing
+    per env controller for a short time means a full initialization only
+    issues `pm list packages` once.
+    
+    Args:
+        env_controller: Environment controller instance
+        
+    Returns:
+        Frozen set of package names (empty if the listing failed)
+    """
+    with _package_cache_lock:
+        cached = _package_cache.get(env_controller)
+    if cached and time.monotonic() - cached[0] < _PACKAGE_CACHE_TTL_SEC:
+        return cached[1]
+    
+    packages = frozenset(adb_utils.get_all_package_names(env_controller))
+    if packages:  # Don't cache a failed listing.
+        with _package_cache_lock:
+            _package_cache[env_controller] = (time.monotonic(), packages)
+    return packages
+
+
+def invalidate_package_cache(env_controller=None) -> None:
+    """Drop cached package listings after installing or uninstalling apps.
+    
+    Args:
+        env_controller: Controller whose listing to drop; all listings if None
+    """
+    with _package_cache_lock:
+        if env_controller is None:
+            _package_cache.clear()
+        else:
+            _package_cache.pop(env_controller, None)
+
+
+# Serializes `adb root` calls made through this helper. It does not cover
+# adb_utils.execute_sql_command, which roots on its own; what keeps adbd from
+# restarting under concurrent configurators is the initializer rooting once
+# before they start, after which `adb root` is a no-op.
+_ROOT_LOCK = threading.Lock()
+
+
 def set_root_if_needed(env_controller) -> None:
     """Set root permissions if needed.
     
@@ -52,7 +109,8 @@ def set_root_if_needed(env_controller) -> None:
         env_controller: Environment controller instance
     """
     try:
-        adb_utils.issue_generic_request(["root"], env_controller)
+        with _ROOT_LOCK:
+            adb_utils.issue_generic_request(["root"], env_controller)
     except Exception as e:
         logging.warning(f"Failed to set root permissions: {e}")
 
@@ -61,6 +119,7 @@ def set_root_if_needed(env_controller) -> None:
 adb_utils.set_root_if_needed = set_root_if_needed
 
 
+@functools.lru_cache(maxsize=1)
 def get_default_adb_path() -> str:
     """Get the default ADB path based on the current platform."""
     system = platform.system()
@@ -97,8 +156,7 @@ def ensure_app_ready(app_key: str, env_controller) -> bool:
     
     # Check if app is installed
     try:
-        all_packages = adb_utils.get_all_package_names(env_controller)
-        if package_name not in all_packages:
+        if package_name not in get_installed_packages(env_controller):
             logging.error(f"App {package_name} is not installed! Please install it first.")
             return False
     except Exception as e:
@@ -137,7 +195,7 @@ def check_database_exists(db_path: str, env_controller) -> bool:
         True if database exists, False otherwise
     """
     try:
-        db_check_cmd = ['shell', f'ls {db_path}']
+        db_check_cmd = ['shell', f'ls {shlex.quote(db_path)}']
         db_check_response = adb_utils.issue_generic_request(db_check_cmd, env_controller)
         output = db_check_response.generic.output.decode('utf-8', errors='ignore')
         logging.info(f"Database check result for {db_path}: {output}")
@@ -243,6 +301,97 @@ def safe_sql_insert(db_path: str, table_name: str, data_obj, exclude_key: str, e
         return False
 
 
+def _sql_literal(value: Any) -> str:
+    """Format a value as an SQLite literal safe inside a double-quoted shell arg."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float) and not math.isfinite(value):
+        # SQLite has no NaN/infinity literals; bare `nan`/`inf` would be
+        # read as column names
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace("'", "''")
+    for char in ('\\', '"', '$', '`'):
+        escaped = escaped.replace(char, '\\' + char)
+    return f"'{escaped}'"
+
+
+def _sql_identifier(name: str) -> str:
+    """Quote a column name for SQLite inside a double-quoted shell arg.
+    
+    Columns such as JoplinNote.order are SQL keywords, so every name is quoted.
+    """
+    return '\\"' + name.replace('"', '\\"\\"') + '\\"'
+
+
+# Rows per INSERT statement; older SQLite builds cap a multi-row VALUES
+# clause at 500 terms.
+_MAX_ROWS_PER_INSERT = 500
+
+
+def build_values_insert_sql(table_name: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Build multi-row INSERT statements from plain value tuples.
+    
+    Like build_insert_sql, the result is meant to be wrapped in double quotes
+    on the adb shell command line.
+    
+    Args:
+        table_name: Name of the table
+        columns: Column names, in the order of the values in each row
+        rows: Value tuples, one per row
+    
+    Returns:
+        One INSERT ... VALUES (...),(...); statement per 500 rows
+    """
+    column_list = ','.join(_sql_identifier(column) for column in columns)
+    statements = []
+    for start in range(0, len(rows), _MAX_ROWS_PER_INSERT):
+        tuples = ','.join(
+            '(' + ','.join(_sql_literal(value) for value in row) + ')'
+            for row in rows[start:start + _MAX_ROWS_PER_INSERT]
+        )
+        statements.append(f"INSERT INTO {table_name} ({column_list}) VALUES {tuples};")
+    return ' '.join(statements)
+
+
+def build_insert_sql(rows: List[Any], table_name: str, exclude_key: Optional[str] = None) -> str:
+    """Build multi-row INSERT statements for dataclass rows.
+    
+    The result is meant for adb_utils.execute_sql_command, which wraps the
+    statement in double quotes, so column quotes and values are shell-escaped.
+    
+    Args:
+        rows: Dataclass rows of the same type
+        table_name: Name of the table
+        exclude_key: Key to exclude from insertion (usually the autoincrement id)
+    
+    Returns:
+        SQL statements of the form INSERT ... VALUES (...),(...);
+    """
+    if not rows:
+        return ''
+    
+    field_names = [
+        field.name for field in dataclasses.fields(rows[0]) if field.name != exclude_key
+    ]
+    values = [tuple(getattr(row, name) for name in field_names) for row in rows]
+    return build_values_insert_sql(table_name, field_names, values)
+
+
+def build_batch_insert_sql(rows: List[Any], table_name: str, exclude_key: Optional[str] = None) -> str:
+    """Build one transaction inserting all rows, see build_insert_sql.
+    
+    Returns:
+        SQL script of the form BEGIN; INSERT ... VALUES (...),(...); COMMIT;
+    """
+    if not rows:
+        return ''
+    return f"BEGIN; {build_insert_sql(rows, table_name, exclude_key)} COMMIT;"
+
+
 def parse_datetime_string(date_str: str, time_str: str = "00:00") -> Optional[datetime.datetime]:
     """Parse date and time strings into datetime object.
     
@@ -267,6 +416,7 @@ def parse_datetime_string(date_str: str, time_str: str = "00:00") -> Optional[da
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def get_font_path() -> str:
     """Get available font path for image generation.
     
@@ -359,7 +509,7 @@ def ensure_directory_exists(path: str, env_controller) -> bool:
         True if directory exists or was created successfully
     """
     try:
-        mkdir_cmd = ['shell', f'mkdir -p {path}']
+        mkdir_cmd = ['shell', f'mkdir -p {shlex.quote(path)}']
         adb_utils.issue_generic_request(mkdir_cmd, env_controller)
         return True
     except Exception as e:
@@ -367,19 +517,26 @@ def ensure_directory_exists(path: str, env_controller) -> bool:
         return False
 
 
-def trigger_media_scan(path: str, env_controller) -> None:
-    """Trigger media scan for a specific path.
+def trigger_media_scan(paths, env_controller, wait_sec: float = 1.0) -> None:
+    """Trigger media scan for one or more paths in a single shell call.
     
     Args:
-        path: Path to scan
+        paths: Path or list of paths to scan
         env_controller: Environment controller instance
+        wait_sec: Time to wait afterwards; the scan itself is asynchronous
     """
+    if isinstance(paths, str):
+        paths = [paths]
     try:
-        scan_cmd = f'am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d file://{path}'
-        adb_utils.issue_generic_request(['shell', scan_cmd], env_controller)
-        time.sleep(1)  # Wait for scan to complete
+        scan_cmds = [
+            f'am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d {shlex.quote("file://" + path)}'
+            for path in paths
+        ]
+        adb_utils.issue_generic_request(['shell', '; '.join(scan_cmds)], env_controller)
+        if wait_sec > 0:
+            time.sleep(wait_sec)
     except Exception as e:
-        logging.warning(f"Failed to trigger media scan for {path}: {e}")
+        logging.warning(f"Failed to trigger media scan for {', '.join(paths)}: {e}")
 
 
 def cleanup_temp_file(file_path: str) -> None:
@@ -0,0 +1,108 @@
+"""Tests for the SQL building helpers."""
+
+import dataclasses
+import datetime
+import re
+import sqlite3
+
+from absl.testing import absltest
+
+from android_world.task_evals.utils import sqlite_schema_utils
+from emulator_init.utils import helpers
+
+
+def _shell_unquote(sql: str) -> str:
+    """What the device shell passes to sqlite3 for a double-quoted argument."""
+    return re.sub(r'\\([\\"$`])', r'\1', sql)
+
+
+def _create_table(connection: sqlite3.Connection, table_name: str, row_type: type) -> None:
+    columns = ', '.join(f'"{field.name}"' for field in dataclasses.fields(row_type))
+    connection.execute(f'CREATE TABLE {table_name} ({columns})')
+
+
+class SqlLiteralTest(absltest.TestCase):
+    
+    def test_none_is_null(self):
+        self.assertEqual(helpers._sql_literal(None), 'NULL')
+    
+    def test_bools_are_integers(self):
+        self.assertEqual(helpers._sql_literal(True), '1')
+        self.assertEqual(helpers._sql_literal(False), '0')
+    
+    def test_numbers_are_unquoted(self):
+        self.assertEqual(helpers._sql_literal(42), '42')
+        self.assertEqual(helpers._sql_literal(1.5), '1.5')
+    
+    def test_non_finite_floats_are_null(self):
+        self.assertEqual(helpers._sql_literal(float('nan')), 'NULL')
+        self.assertEqual(helpers._sql_literal(float('inf')), 'NULL')
+        self.assertEqual(helpers._sql_literal(float('-inf')), 'NULL')
+    
+    def test_single_quote_is_doubled(self):
+        self.assertEqual(helpers._sql_literal("it's"), "'it''s'")
+    
+    def test_shell_characters_are_escaped(self):
+        self.assertEqual(helpers._sql_literal('say "hi"'), "'say \\\"hi\\\"'")
+        self.assertEqual(helpers._sql_literal('$HOME'), "'\\$HOME'")
+        self.assertEqual(helpers._sql_literal('`id`'), "'\\`id\\`'")
+    
+    def test_backslash_is_escaped_before_other_characters(self):
+        self.assertEqual(helpers._sql_literal('a\\b'), "'a\\\\b'")
+        self.assertEqual(helpers._sql_literal('\\$'), "'\\\\\\$'")
+    
+    def test_other_values_are_stringified(self):
+        self.assertEqual(helpers._sql_literal(datetime.date(2024, 1, 2)), "'2024-01-02'")
+
+
+class BuildValuesInsertSqlTest(absltest.TestCase):
+    
+    def test_single_statement(self):
+        sql = helpers.build_values_insert_sql('t', ('a', 'b'), [(1, "x'y"), (None, True)])
+        self.assertEqual(sql, "INSERT INTO t (\\\"a\\\",\\\"b\\\") VALUES (1,'x''y'),(NULL,1);")
+    
+    def test_no_rows(self):
+        self.assertEqual(helpers.build_values_insert_sql('t', ('a',), []), '')
+    
+    def test_splits_into_statements_of_500_rows(self):
+        sql = helpers.build_values_insert_sql('t', ('a',), [(i,) for i in range(1001)])
+        statements = sql.split('; ')
+        self.assertLen(statements, 3)
+        self.assertEqual(statements[0].count('('), 501)
+        self.assertEqual(statements[1].count('('), 501)
+        self.assertEqual(statements[2], 'INSERT INTO t (\\"a\\") VALUES (1000);')
+
+
+
+class BuildInsertSqlTest(absltest.TestCase):
+    
+    def test_runs_against_table_with_keyword_columns(self):
+        notes = [
+            sqlite_schema_utils.JoplinNote(title='a "quoted" $title', body="it's `here`\\n", order=2),
+            sqlite_schema_utils.JoplinNote(title='second'),
+        ]
+        connection = sqlite3.connect(':memory:')
+        _create_table(connection, 'notes', sqlite_schema_utils.JoplinNote)
+        
+        connection.executescript(_shell_unquote(helpers.build_batch_insert_sql(notes, 'notes')))
+        
+        rows = connection.execute('SELECT title, body, "order" FROM notes ORDER BY rowid').fetchall()
+        self.assertEqual(rows, [('a "quoted" $title', "it's `here`\\n", 2), ('second', '', 0)])
+    
+    def test_exclude_key_is_not_inserted(self):
+        folder = sqlite_schema_utils.JoplinFolder(title='Work')
+        sql = helpers.build_insert_sql([folder], 'folders', 'deleted_time')
+        self.assertNotIn('deleted_time', sql)
+        
+        connection = sqlite3.connect(':memory:')
+        _create_table(connection, 'folders', sqlite_schema_utils.JoplinFolder)
+        connection.executescript(_shell_unquote(sql))
+        self.assertEqual(connection.execute('SELECT title FROM folders').fetchall(), [('Work',)])
+    
+    def test_no_rows(self):
+        self.assertEqual(helpers.build_insert_sql([], 'notes'), '')
+        self.assertEqual(helpers.build_batch_insert_sql([], 'notes'), '')
+
+
+if __name__ == '__main__':
+    absltest.main()
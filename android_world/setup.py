@@ -74,6 +74,11 @@ setuptools.setup(
     package_data={'': ['proto/*.proto']},  # Copy protobuf files.
     packages=setuptools.find_packages(),
     setup_requires=['grpcio-tools'],
+    entry_points={
+        'console_scripts': [
+            'emulator-init=emulator_init.cli:run_cli',
+        ],
+    },
     cmdclass={
         'build_py': _BuildPy,
         'generate_protos': _GenerateProtoFiles,